@@ -8,13 +8,18 @@ import json
 from typing import Dict, List, Optional
 from datetime import datetime
 
+MOONSHOT_TIMEOUT = 60.0  # seconds
+
 class MoonshotClient:
     """Client for Moonshot AI API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or os.getenv("MOONSHOT_API_KEY")
         self.base_url = "https://api.moonshot.cn/v1"
         self.model = os.getenv("MOONSHOT_MODEL", "moonshot-v1-8k")
+        # Optional long-lived connection pool owned by the caller; without
+        # one each request opens (and closes) its own connection
+        self.http_client = http_client
     
     async def chat_completion(
         self, 
@@ -39,14 +44,26 @@ class MoonshotClient:
         if tools:
             payload["tools"] = tools
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
+        if self.http_client is not None:
+            response = await self.http_client.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload
             )
-            response.raise_for_status()
-            return response.json()
+        else:
+            async with httpx.AsyncClient(timeout=MOONSHOT_TIMEOUT) as client:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    json=payload
+                )
+        response.raise_for_status()
+        return response.json()
+    
+    async def close(self):
+        """Close the shared connection pool, if one was given"""
+        if self.http_client is not None:
+            await self.http_client.aclose()
 
 
 class KingMouseAgent:
@@ -3,11 +3,16 @@ Authentication and Security Utilities
 Provides JWT auth, rate limiting, and security controls
 """
 import os
+import re
+import string
 import jwt
 import hashlib
+import hmac
 import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, Header, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import redis.asyncio as redis
@@ -20,6 +25,7 @@ JWT_SECRET = os.getenv("JWT_SECRET", secrets.token_hex(32))
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+_ADMIN_API_KEY_BYTES = ADMIN_API_KEY.encode() if ADMIN_API_KEY else None
 TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", secrets.token_hex(16))
 
 # Redis for rate limiting and token blacklist
@@ -34,6 +40,11 @@ SECURITY_HEADERS = {
     "Content-Security-Policy": "default-src 'self'",
 }
 
+@lru_cache(maxsize=4096)
+def _decode_token_cached(token: str, minute_bucket: int) -> Dict[str, Any]:
+    """Verify a JWT's signature and claims, memoized per token for one minute bucket"""
+    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+
 class SecurityManager:
     """Manages authentication, rate limiting, and security controls"""
     
@@ -87,7 +98,13 @@ class SecurityManager:
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode a JWT token"""
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            now = time.time()
+            payload = _decode_token_cached(token, int(now) // 60)
+            
+            # A cached payload can outlive its exp by up to a minute, so re-check it
+            exp = payload.get("exp")
+            if exp is not None and exp <= now:
+                raise jwt.ExpiredSignatureError("Signature has expired")
             
             # Check if token is blacklisted
             if self.redis_client:
@@ -95,7 +112,7 @@ class SecurityManager:
                 if jti and self.redis_client.get(f"blacklist:{jti}"):
                     raise HTTPException(status_code=401, detail="Token has been revoked")
             
-            return payload
+            return dict(payload)
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token has expired")
         except jwt.InvalidTokenError:
@@ -146,16 +163,16 @@ class SecurityManager:
     
     async def verify_admin_api_key(self, authorization: str = Header(None)) -> bool:
         """Dependency to verify admin API key"""
-        if not ADMIN_API_KEY:
+        if not _ADMIN_API_KEY_BYTES:
             raise HTTPException(status_code=500, detail="Admin API key not configured")
         
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Missing authorization header")
         
-        token = authorization.replace("Bearer ", "")
+        token = authorization[7:].encode()
         
-        # Use constant-time comparison to prevent timing attacks
-        if not secrets.compare_digest(token, ADMIN_API_KEY):
+        # Wrong-length keys fail fast; equal-length keys use a constant-time comparison
+        if len(token) != len(_ADMIN_API_KEY_BYTES) or not hmac.compare_digest(token, _ADMIN_API_KEY_BYTES):
             raise HTTPException(status_code=403, detail="Invalid admin API key")
         
         return True
@@ -207,21 +224,19 @@ RATE_LIMITS = {
 
 # ========== CORS CONFIGURATION ==========
 
-def get_cors_origins() -> list:
+def get_cors_origins() -> Tuple[str, ...]:
     """Get allowed CORS origins based on environment"""
-    env = os.getenv("ENVIRONMENT", "development")
-    allowed = os.getenv("ALLOWED_ORIGINS", "")
+    return _cors_origins(os.getenv("ENVIRONMENT", "development"), os.getenv("ALLOWED_ORIGINS", ""))
+
+@lru_cache(maxsize=4)
+def _cors_origins(env: str, allowed: str) -> Tuple[str, ...]:
+    """Parse the origin list once per (ENVIRONMENT, ALLOWED_ORIGINS) pair"""
+    extra = tuple(origin.strip() for origin in allowed.split(",")) if allowed else ()
     
     if env == "production":
-        if allowed:
-            return [origin.strip() for origin in allowed.split(",")]
-        return []  # Empty means no CORS in production (must be explicitly set)
-    else:
-        # Development allows localhost
-        origins = ["http://localhost:3000", "http://localhost:5173"]
-        if allowed:
-            origins.extend([origin.strip() for origin in allowed.split(",")])
-        return origins
+        return extra  # Empty means no CORS in production (must be explicitly set)
+    # Development allows localhost
+    return ("http://localhost:3000", "http://localhost:5173") + extra
 
 # ========== TELEGRAM WEBHOOK SECURITY ==========
 
@@ -244,6 +259,14 @@ def verify_telegram_webhook(update: Dict[str, Any], secret_token: str = Header(N
 
 # ========== REQUEST VALIDATION ==========
 
+# Built once at import; the sanitizers run on every request.
+# Patterns are linear-time on hostile input: bounded, unambiguous alternations.
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_LABEL_CHARS = frozenset(string.ascii_letters + string.digits + "-")
+_EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
+_SQL_INJECTION_RE = re.compile(r"'|;|--|/\*|\*/|DROP|DELETE|INSERT|UPDATE", re.IGNORECASE)
+_COMPANY_NAME_STRIP_RE = re.compile(r"""[<>'"]""")
+
 class RequestValidator:
     """Validates incoming requests for security issues"""
     
@@ -269,24 +292,30 @@ class RequestValidator:
             raise HTTPException(status_code=400, detail="Invalid customer ID format")
         
         # Check for SQL injection patterns
-        dangerous_patterns = ["'", ";", "--", "/*", "*/", "DROP", "DELETE", "INSERT", "UPDATE"]
-        for pattern in dangerous_patterns:
-            if pattern.upper() in customer_id.upper():
-                raise HTTPException(status_code=400, detail="Invalid customer ID format")
+        if _SQL_INJECTION_RE.search(customer_id):
+            raise HTTPException(status_code=400, detail="Invalid customer ID format")
         
         return customer_id
     
     @staticmethod
     def sanitize_email(email: str) -> str:
         """Sanitize and validate email format"""
-        import re
-        
         if not email or len(email) > 254:
             raise HTTPException(status_code=400, detail="Invalid email format")
         
-        # Basic email validation
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
+        # Basic email validation: local@label.label.tld, checked without regex
+        local, at, domain = email.partition("@")
+        labels = domain.split(".")
+        tld = labels.pop()
+        if (
+            not at
+            or not 1 <= len(local) <= 64
+            or not _EMAIL_LOCAL_CHARS.issuperset(local)
+            or not 1 <= len(labels) <= 8
+            or not 2 <= len(tld) <= 24
+            or not _EMAIL_TLD_CHARS.issuperset(tld)
+            or not all(1 <= len(label) <= 63 and _EMAIL_LABEL_CHARS.issuperset(label) for label in labels)
+        ):
             raise HTTPException(status_code=400, detail="Invalid email format")
         
         return email.lower()
@@ -300,8 +329,8 @@ class RequestValidator:
         if len(name) < 2 or len(name) > 100:
             raise HTTPException(status_code=400, detail="Company name must be 2-100 characters")
         
-        # Remove potentially dangerous characters
-        sanitized = name.replace("<", "").replace(">", "").replace("'", "").replace('"', "")
+        # Remove potentially dangerous characters (length already capped above)
+        sanitized = _COMPANY_NAME_STRIP_RE.sub("", name)
         
         return sanitized.strip()
 
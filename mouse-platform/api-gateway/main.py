@@ -1,9 +1,10 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import asyncio
+import json
 import os
 import stripe
 from datetime import datetime
@@ -20,6 +21,8 @@ from cache_manager import vm_status_cache, screenshot_cache, general_cache
 
 app = FastAPI(title="Mouse Platform API", version="2.1.0-performance")
 
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "600"))  # seconds browsers may cache a preflight
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,11 +30,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=CORS_MAX_AGE,
 )
 
 # Initialize services
-platform = MousePlatform()
 supabase = SupabaseClient()
+platform = MousePlatform(supabase=supabase)
 orgo = OrgoClient(api_key=os.getenv("ORGO_API_KEY"))
 telegram = TelegramBot(token=os.getenv("TELEGRAM_BOT_TOKEN"))
 stripe_handler = StripeWebhookHandler(supabase)
@@ -102,6 +106,12 @@ async def startup_event():
     """Initialize caches and queues on startup"""
     print("[Startup] Initializing performance optimizations...")
     
+    # Open the Supabase connection early; the platform shares this client
+    try:
+        await supabase.warmup()
+    except Exception as e:
+        print(f"[Startup] Supabase warm-up failed: {e}")
+    
     # Start caches
     await vm_status_cache.start()
     await screenshot_cache.start()
@@ -147,7 +157,8 @@ async def shutdown_event():
     await payment_queue.stop()
     await background_queue.stop()
     
-    # Close HTTP client
+    # Close HTTP clients
+    supabase.close()
     await orgo.close()
     
     print("[Shutdown] Cleanup complete!")
@@ -161,7 +172,7 @@ async def health_check():
         "version": "2.1.0-performance",
         "timestamp": datetime.utcnow().isoformat(),
         "services": {
-            "supabase": supabase.health(),
+            "supabase": await supabase.health(),
             "orgo": orgo.health(),
             "telegram": telegram.health()
         },
@@ -315,32 +326,45 @@ async def stop_vm(customer_id: str, vm_id: str):
 # TOKEN PRICING ROUTES
 # ============================================
 
+def _encode_json(content) -> bytes:
+    """Encode a response body the same way JSONResponse does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+# Packages and rates never change at runtime, so their bodies are encoded once at import
+_TOKEN_PACKAGES_JSON = _encode_json({
+    "packages": [
+        {
+            "slug": p.slug,
+            "name": p.name,
+            "price_cents": p.price_cents,
+            "price": p.display_price,
+            "price_per_1000": p.display_price_per_1000,
+            "token_amount": p.token_amount,
+            "bonus_tokens": getattr(p, 'bonus_tokens', 0),
+            "total_tokens": p.total_tokens,
+            "estimated_hours": getattr(p, 'estimated_hours', int(p.total_tokens / 100)),
+            "description": p.description,
+            "features": p.features,
+            "popular": p.slug == "growth"
+        }
+        for p in TokenPricingConfig.get_all_packages()
+    ]
+})
+_TOKEN_RATES_JSON = _encode_json({
+    "rates": [
+        {
+            "action_type": r.action_type,
+            "tokens": r.tokens,
+            "description": r.description
+        }
+        for r in TokenPricingConfig.get_all_rates()
+    ]
+})
+
 @app.get("/api/v1/token-packages")
 async def get_token_packages():
     """Get all available token packages"""
-    try:
-        packages = TokenPricingConfig.get_all_packages()
-        return {
-            "packages": [
-                {
-                    "slug": p.slug,
-                    "name": p.name,
-                    "price_cents": p.price_cents,
-                    "price": p.display_price,
-                    "price_per_1000": f"${p.price_per_1000_tokens:.2f}",
-                    "token_amount": p.token_amount,
-                    "bonus_tokens": getattr(p, 'bonus_tokens', 0),
-                    "total_tokens": p.total_tokens,
-                    "estimated_hours": getattr(p, 'estimated_hours', int(p.total_tokens / 100)),
-                    "description": p.description,
-                    "features": p.features,
-                    "popular": p.slug == "growth"
-                }
-                for p in packages
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=_TOKEN_PACKAGES_JSON, media_type="application/json")
 
 @app.get("/api/v1/customers/{customer_id}/tokens")
 async def get_token_balance(customer_id: str):
@@ -486,20 +510,7 @@ async def credit_tokens(customer_id: str, request: TokenCreditRequest):
 @app.get("/api/v1/token-rates")
 async def get_token_rates():
     """Get token usage rates"""
-    try:
-        rates = TokenPricingConfig.get_all_rates()
-        return {
-            "rates": [
-                {
-                    "action_type": r.action_type,
-                    "tokens": r.tokens,
-                    "description": r.description
-                }
-                for r in rates
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=_TOKEN_RATES_JSON, media_type="application/json")
 
 @app.get("/api/v1/token-calculator")
 async def calculate_token_cost(
@@ -51,11 +51,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["Authorization", "Content-Type", "X-Idempotency-Key"],
+    max_age=int(os.getenv("CORS_MAX_AGE", "600")),  # seconds browsers may cache a preflight
 )
 
 # Initialize services
-platform = MousePlatform()
 supabase = SupabaseClient()
+platform = MousePlatform(supabase=supabase)
 orgo = OrgoClient(api_key=os.getenv("ORGO_API_KEY"))
 telegram = TelegramBot(token=os.getenv("TELEGRAM_BOT_TOKEN"))
 stripe_handler = StripeWebhookHandler(supabase)
@@ -236,7 +237,7 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "version": "2.0.0-secure",
         "services": {
-            "supabase": supabase.health(),
+            "supabase": await supabase.health(),
             "orgo": orgo.health(),
             "telegram": telegram.health()
         }
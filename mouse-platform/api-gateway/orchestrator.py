@@ -2,6 +2,7 @@
 Mouse Platform Orchestrator
 Core business logic connecting all components - PERFORMANCE OPTIMIZED
 """
+import asyncio
 import os
 import uuid
 import qrcode
@@ -14,7 +15,7 @@ from supabase_client import SupabaseClient
 from orgo_client import OrgoClient
 from telegram_bot import TelegramBot
 from ai_agents import KingMouseAgent, KnightAgent
-from token_pricing import TokenPricingConfig
+from token_pricing import TokenPricingConfig, calculate_vm_cost_minutes
 from async_queue import TaskPriority, payment_queue, background_queue
 from cache_manager import vm_status_cache, screenshot_cache, general_cache
 
@@ -22,8 +23,10 @@ from cache_manager import vm_status_cache, screenshot_cache, general_cache
 class MousePlatform:
     """Main platform orchestrator - optimized for performance"""
     
-    def __init__(self):
-        self.supabase = SupabaseClient()
+    def __init__(self, supabase: Optional[SupabaseClient] = None):
+        # Callers pass their own client so the process shares one connection
+        # pool and one query concurrency cap
+        self.supabase = supabase or SupabaseClient()
         self.orgo = OrgoClient(api_key=os.getenv("ORGO_API_KEY"))
         self.telegram = TelegramBot(token=os.getenv("TELEGRAM_BOT_TOKEN"))
         self.workspace_id = os.getenv("ORGO_WORKSPACE_ID")
@@ -43,7 +46,6 @@ class MousePlatform:
         background_queue.register_handler("cleanup", self._handle_cleanup_async)
         
         # Start queues
-        import asyncio
         try:
             loop = asyncio.get_event_loop()
             if not loop.is_closed():
@@ -139,10 +141,10 @@ class MousePlatform:
         5. Start knight on VM
         6. Report back to customer
         """
-        # Get customer and their King Mouse
-        customer = await self.supabase.get_customer(customer_id)
-        king_mouse = await self.supabase.get_king_mouse(customer_id)
-        token_balance = await self.supabase.get_token_balance(customer_id)
+        # Get customer, their King Mouse and token balance concurrently
+        bundle = await self.supabase.get_customer_bundle(customer_id)
+        customer = bundle["customer"]
+        token_balance = bundle["token_balance"]
         
         if not customer:
             return {"message": "Customer not found", "actions": []}
@@ -159,17 +161,23 @@ class MousePlatform:
         # Process message
         result = await king.process_message(message)
         
-        # Charge tokens for AI message processing
+        # Charge tokens for AI message processing and log the chat in one round-trip;
+        # every exchange is logged, and the debit is skipped in the database when
+        # the balance can't cover it
         message_cost = 1  # 1 token per message
-        if current_balance >= message_cost:
-            debit_result = await self.supabase.debit_tokens(
-                customer_id=customer_id,
-                amount=message_cost,
-                description="AI message processing",
-                reference_type="ai_message"
-            )
-            if debit_result and debit_result[0].get("success"):
-                current_balance = debit_result[0].get("new_balance", current_balance)
+        debit_result = await self.supabase.debit_tokens_and_log(
+            customer_id=customer_id,
+            amount=message_cost,
+            description="AI message processing",
+            chat={
+                "message": message,
+                "response": result["message"],
+                "action_taken": result.get("action")
+            },
+            reference_type="ai_message"
+        )
+        if debit_result and debit_result[0].get("success"):
+            current_balance = debit_result[0].get("new_balance", current_balance)
         
         # Check if we need to deploy an employee
         if result.get("action") == "deploy_employee":
@@ -225,9 +233,9 @@ class MousePlatform:
         token_balance = await self.supabase.get_token_balance(customer_id)
         current_balance = token_balance.get("balance", 0) if token_balance else 0
         
-        # Estimate cost: 1 token per minute, minimum 60 minutes (1 hour)
+        # Estimate cost: minimum 60 minutes (1 hour) at the VM runtime rate
         estimated_minutes = 60
-        estimated_cost = TokenPricingConfig.calculate_vm_cost(estimated_minutes)
+        estimated_cost = calculate_vm_cost_minutes(estimated_minutes)
         
         if current_balance < estimated_cost:
             raise Exception(f"Insufficient tokens. Need {estimated_cost} tokens, have {current_balance}")
@@ -294,7 +302,7 @@ class MousePlatform:
         Charge tokens for VM usage
         Called periodically while VM is running
         """
-        cost = TokenPricingConfig.calculate_vm_cost(minutes)
+        cost = calculate_vm_cost_minutes(minutes)
         
         debit_result = await self.supabase.debit_tokens(
             customer_id=customer_id,
@@ -475,20 +483,21 @@ class MousePlatform:
             reference_type="demo"
         )
         
-        # 3. Deploy Web Developer
-        web_dev = await self.deploy_employee(
-            customer_id=customer_id,
-            role="Web Developer",
-            name="Alex (Web Dev)",
-            task="Build a Shopify website for Clean Eats meal prep company with menu, ordering, and about page"
-        )
-        
-        # 4. Deploy Social Media Manager
-        social_manager = await self.deploy_employee(
-            customer_id=customer_id,
-            role="Social Media Manager",
-            name="Sam (Social Media)",
-            task="Create Instagram content strategy and 5 posts for Clean Eats launch"
+        # 3-4. Deploy Web Developer and Social Media Manager at once; the VM
+        # calls and the Supabase reads/writes (threaded by _execute) overlap
+        web_dev, social_manager = await asyncio.gather(
+            self.deploy_employee(
+                customer_id=customer_id,
+                role="Web Developer",
+                name="Alex (Web Dev)",
+                task="Build a Shopify website for Clean Eats meal prep company with menu, ordering, and about page"
+            ),
+            self.deploy_employee(
+                customer_id=customer_id,
+                role="Social Media Manager",
+                name="Sam (Social Media)",
+                task="Create Instagram content strategy and 5 posts for Clean Eats launch"
+            ),
         )
         
         # Get updated token balance
@@ -571,7 +580,7 @@ class MousePlatform:
                     "currency": "usd",
                     "product_data": {
                         "name": package.name,
-                        "description": f"{package.total_tokens:,} tokens - {package.description}"
+                        "description": f"{package.display_tokens} tokens - {package.description}"
                     },
                     "unit_amount": package.price_cents,
                 },
@@ -664,19 +673,16 @@ class MousePlatform:
             )
             return cached
         
-        customer = await self.supabase.get_customer(customer_id)
+        # Independent reads: balance, recent transactions and employees
+        customer, token_balance, transactions, employees = await asyncio.gather(
+            self.supabase.get_customer(customer_id),
+            self.supabase.get_token_balance(customer_id),
+            self.supabase.get_token_transactions(customer_id, limit=10),
+            self.supabase.get_employees_by_customer(customer_id)
+        )
         if not customer:
             raise Exception("Customer not found")
         
-        # Get token balance
-        token_balance = await self.supabase.get_token_balance(customer_id)
-        
-        # Get recent transactions
-        transactions = await self.supabase.get_token_transactions(customer_id, limit=10)
-        
-        # Get employees
-        employees = await self.supabase.get_employees_by_customer(customer_id)
-        
         # Get available packages
         packages = TokenPricingConfig.get_all_packages()
         
@@ -7,12 +7,17 @@ import re
 import json
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from urllib.parse import urlparse, urljoin
 import feedparser
 
+# Companies researched at once by batch_research and research_as_completed; each
+# one fans out to Apollo, the website, LinkedIn and news, so keep bursts under
+# Apollo's rate limit
+MAX_CONCURRENT_RESEARCH = 10
+
 @dataclass
 class CompanyResearch:
     """Complete research profile for a prospect company"""
@@ -565,10 +570,19 @@ Provide JSON:
         name = domain.replace('www.', '').split('.')[0]
         return name.replace('-', ' ').replace('_', ' ').title()
     
+    def _capped_research(self, domains: List[str]) -> List[Awaitable[CompanyResearch]]:
+        """One research_company call per domain, at most MAX_CONCURRENT_RESEARCH running at a time"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RESEARCH)
+        
+        async def research(domain: str) -> CompanyResearch:
+            async with semaphore:
+                return await self.research_company(domain)
+        
+        return [research(domain) for domain in domains]
+    
     async def batch_research(self, domains: List[str]) -> List[CompanyResearch]:
-        """Research multiple companies in batch"""
-        tasks = [self.research_company(domain) for domain in domains]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        """Research multiple companies concurrently, returning results in input order"""
+        results = await asyncio.gather(*self._capped_research(domains), return_exceptions=True)
         
         successful = []
         for result in results:
@@ -578,6 +592,16 @@ Provide JSON:
                 successful.append(result)
         
         return successful
+    
+    async def research_as_completed(self, domains: List[str]) -> AsyncIterator[CompanyResearch]:
+        """Research multiple companies concurrently, yielding each result as soon as it finishes"""
+        for future in asyncio.as_completed(self._capped_research(domains)):
+            try:
+                result = await future
+            except Exception as e:
+                print(f"Research error: {e}")
+                continue
+            yield result
 
 
 # AI Employee Role Templates for recommendations
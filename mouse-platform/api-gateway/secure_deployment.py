@@ -69,9 +69,9 @@ class SecureEmployeeDeployment:
             token_balance = await self.supabase.get_token_balance(customer_id)
             current_balance = token_balance.get("balance", 0) if token_balance else 0
             
-            # Estimate cost: 1 token per minute, minimum 60 minutes (1 hour)
+            # Estimate cost: minimum 60 minutes (1 hour) at the VM runtime rate
             estimated_minutes = 60
-            estimated_cost = TokenPricingConfig.calculate_vm_cost(estimated_minutes)
+            estimated_cost = TokenPricingConfig.calculate_vm_cost_minutes(estimated_minutes)
             
             if current_balance < estimated_cost:
                 raise Exception(f"Insufficient tokens. Need {estimated_cost} tokens, have {current_balance}")
@@ -333,13 +333,11 @@ class StripeWebhookHandler:
         stripe_customer = event["data"]["object"]
         stripe_id = stripe_customer["id"]
         
-        # Update our customer record
-        customer = await self.supabase.get_customer_by_stripe_id(stripe_id)
-        if customer:
-            await self.supabase.update_customer(customer["id"], {
-                "stripe_customer_id": None,
-                "stripe_subscription_status": "cancelled"
-            })
+        # Update our customer record (single statement, no-op if unknown)
+        await self.supabase.update_customer_by_stripe_id(stripe_id, {
+            "stripe_customer_id": None,
+            "stripe_subscription_status": "cancelled"
+        })
         
         return {"received": True, "handled": True, "type": "customer.deleted"}
     
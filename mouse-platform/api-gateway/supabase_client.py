@@ -2,117 +2,199 @@
 Supabase Client
 Database operations with RLS support and pagination
 """
+import asyncio
 import os
-from typing import Dict, List, Optional
-from supabase import create_client, Client
+import random
+import time
+import httpx
+from typing import AsyncIterator, Dict, List, Optional
+from supabase import create_client, Client, ClientOptions
 
+# Supabase configuration (required - a missing key fails at import, not on first query)
+SUPABASE_URL = os.environ["SUPABASE_URL"]
+SUPABASE_SERVICE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
+
+# Outbound query concurrency cap; keep in step with the Supabase plan's
+# connection limit (15 on the free tier) so bursts queue here instead of
+# failing with "max client connections reached"
+MAX_CONCURRENT_QUERIES = int(os.getenv("SUPABASE_MAX_CONCURRENT_QUERIES", "15"))
+
+# PostgREST transport: _execute runs queries on worker threads, and this
+# shared (thread-safe) HTTP/2 client multiplexes them over one session
+# instead of paying a TCP/TLS handshake per connection
+HTTP_TIMEOUT = 120.0  # seconds (supabase-py's default PostgREST timeout)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+# Health probe caching (load balancers ping /health roughly once a second)
+HEALTH_CACHE_TTL = 5.0  # seconds a healthy result is reused, plus up to 1s of jitter
+HEALTH_FAILURE_TTL = 2.0  # seconds a failed result is reused, so an outage isn't re-probed every ping
+HEALTH_PROBE_TIMEOUT = 2.0  # seconds before a slow probe counts as unhealthy
 
 class SupabaseClient:
+    # Fixed attribute set: cheaper lookups on the shared instance and
+    # typos raise instead of silently creating new attributes
+    __slots__ = ("url", "service_key", "client", "_semaphore",
+                 "_health_expires_at", "_health_value")
+    
     def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        self.client: Client = create_client(self.url, self.service_key)
+        self.url = SUPABASE_URL
+        self.service_key = SUPABASE_SERVICE_KEY
+        http_client = httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        self.client: Client = create_client(
+            self.url,
+            self.service_key,
+            options=ClientOptions(httpx_client=http_client)
+        )
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+        self._health_expires_at = 0.0
+        self._health_value = False
     
-    def health(self) -> bool:
-        """Check Supabase connection health"""
+    async def health(self) -> bool:
+        """Check Supabase connection health, reusing a recent probe result"""
+        now = time.monotonic()
+        if now < self._health_expires_at:
+            return self._health_value
         try:
-            self.client.table("customers").select("count", count="exact").execute()
-            return True
+            # Off the event loop and outside the query cap, so a stalled
+            # Supabase can't block other requests or be hidden by a busy pool
+            await asyncio.wait_for(
+                asyncio.to_thread(self.client.table("customers").select("count", count="exact").execute),
+                HEALTH_PROBE_TIMEOUT
+            )
+            healthy = True
         except Exception:
-            return False
+            healthy = False
+        ttl = HEALTH_CACHE_TTL if healthy else HEALTH_FAILURE_TTL
+        self._health_expires_at = now + ttl + random.random()
+        self._health_value = healthy
+        return healthy
+    
+    async def warmup(self):
+        """Open the HTTP connection with a cheap query before serving traffic"""
+        await self._execute(self.client.table("customers").select("id").limit(1))
+    
+    def close(self):
+        """Close the underlying HTTP connections"""
+        self.client.postgrest.aclose()
+    
+    async def _execute(self, query):
+        """Run a query while holding a slot in the outbound concurrency cap"""
+        async with self._semaphore:
+            # supabase-py's client is synchronous; run it on a worker thread so
+            # the event loop keeps serving and concurrent queries actually overlap
+            return await asyncio.to_thread(query.execute)
     
     # Customer operations
     async def create_customer(self, data: Dict):
         """Create a new customer record"""
-        return self.client.table("customers").insert(data).execute()
+        return await self._execute(self.client.table("customers").insert(data))
     
     async def get_customer(self, customer_id: str) -> Optional[Dict]:
         """Get customer by ID"""
-        result = self.client.table("customers").select("*").eq("id", customer_id).execute()
+        result = await self._execute(self.client.table("customers").select("*").eq("id", customer_id).limit(1))
         return result.data[0] if result.data else None
     
     async def get_customer_by_email(self, email: str) -> Optional[Dict]:
         """Get customer by email address"""
-        result = self.client.table("customers").select("*").eq("email", email).execute()
+        result = await self._execute(self.client.table("customers").select("*").eq("email", email).limit(1))
         return result.data[0] if result.data else None
     
     async def get_customer_by_stripe_id(self, stripe_id: str) -> Optional[Dict]:
         """Get customer by Stripe customer ID"""
-        result = self.client.table("customers").select("*").eq("stripe_customer_id", stripe_id).execute()
+        result = await self._execute(self.client.table("customers").select("*").eq("stripe_customer_id", stripe_id).limit(1))
         return result.data[0] if result.data else None
     
     async def update_customer(self, customer_id: str, data: Dict):
         """Update customer record"""
-        return self.client.table("customers").update(data).eq("id", customer_id).execute()
+        return await self._execute(self.client.table("customers").update(data).eq("id", customer_id))
     
     async def update_customer_by_stripe_id(self, stripe_id: str, data: Dict):
         """Update customer by Stripe ID"""
-        return self.client.table("customers").update(data).eq("stripe_customer_id", stripe_id).execute()
+        return await self._execute(self.client.table("customers").update(data).eq("stripe_customer_id", stripe_id))
     
     async def delete_customer(self, customer_id: str):
         """Delete customer record"""
-        return self.client.table("customers").delete().eq("id", customer_id).execute()
+        return await self._execute(self.client.table("customers").delete().eq("id", customer_id))
     
     # King Mouse operations
     async def create_king_mouse(self, data: Dict):
         """Create King Mouse bot record"""
-        return self.client.table("king_mice").insert(data).execute()
+        return await self._execute(self.client.table("king_mice").insert(data))
     
     async def get_king_mouse(self, customer_id: str) -> Optional[Dict]:
         """Get King Mouse by customer ID"""
-        result = self.client.table("king_mice").select("*").eq("customer_id", customer_id).execute()
+        result = await self._execute(self.client.table("king_mice").select("*").eq("customer_id", customer_id).limit(1))
         return result.data[0] if result.data else None
     
     async def get_customer_by_telegram_chat(self, chat_id: int) -> Optional[Dict]:
         """Get customer by Telegram chat ID"""
-        result = self.client.table("king_mice").select("customer_id").eq("telegram_chat_id", chat_id).execute()
+        result = await self._execute(self.client.table("king_mice").select("customer_id").eq("telegram_chat_id", chat_id).limit(1))
         if result.data:
             return await self.get_customer(result.data[0]["customer_id"])
         return None
     
+    async def get_customer_bundle(self, customer_id: str) -> Dict:
+        """Get customer, King Mouse and token balance concurrently"""
+        results = await asyncio.gather(
+            self.get_customer(customer_id),
+            self.get_king_mouse(customer_id),
+            self.get_token_balance(customer_id),
+            return_exceptions=True
+        )
+        # Let every read settle, then surface the first failure
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        customer, king_mouse, token_balance = results
+        return {
+            "customer": customer,
+            "king_mouse": king_mouse,
+            "token_balance": token_balance
+        }
+    
     # Employee operations
     async def create_employee(self, data: Dict):
         """Create employee record"""
-        return self.client.table("employees").insert(data).execute()
+        return await self._execute(self.client.table("employees").insert(data))
     
     async def update_employee(self, employee_id: str, data: Dict):
         """Update employee record"""
-        return self.client.table("employees").update(data).eq("id", employee_id).execute()
+        return await self._execute(self.client.table("employees").update(data).eq("id", employee_id))
     
     async def get_employee(self, employee_id: str) -> Optional[Dict]:
         """Get employee by ID"""
-        result = self.client.table("employees").select("*").eq("id", employee_id).execute()
+        result = await self._execute(self.client.table("employees").select("*").eq("id", employee_id).limit(1))
         return result.data[0] if result.data else None
     
     async def get_employee_by_vm(self, vm_id: str) -> Optional[Dict]:
         """Get employee by VM ID"""
-        result = self.client.table("employees").select("*").eq("vm_id", vm_id).execute()
+        result = await self._execute(self.client.table("employees").select("*").eq("vm_id", vm_id).limit(1))
         return result.data[0] if result.data else None
     
     async def get_employee_by_idempotency_key(self, idempotency_key: str) -> Optional[Dict]:
         """Get employee by idempotency key"""
-        result = self.client.table("employees").select("*").eq("idempotency_key", idempotency_key).execute()
+        result = await self._execute(self.client.table("employees").select("*").eq("idempotency_key", idempotency_key).limit(1))
         return result.data[0] if result.data else None
     
     async def get_employees_by_customer(self, customer_id: str, skip: int = 0, limit: int = 100) -> List[Dict]:
         """Get employees by customer ID with pagination support"""
-        result = self.client.table("employees").select("*").eq("customer_id", customer_id).execute()
+        result = await self._execute(self.client.table("employees").select("*").eq("customer_id", customer_id))
         return result.data or []
     
     async def count_employee_vms(self, customer_id: str) -> int:
         """Count active VMs for a customer"""
-        result = self.client.table("employees").select("count", count="exact").eq("customer_id", customer_id).execute()
+        result = await self._execute(self.client.table("employees").select("count", count="exact").eq("customer_id", customer_id))
         return result.count if hasattr(result, 'count') else len(result.data or [])
     
     # Chat logging
     async def log_chat(self, data: Dict):
         """Log chat interaction"""
-        return self.client.table("chat_logs").insert(data).execute()
+        return await self._execute(self.client.table("chat_logs").insert(data))
     
     # Revenue tracking
     async def create_revenue_event(self, data: Dict):
         """Create revenue event record"""
-        return self.client.table("revenue_events").insert(data).execute()
+        return await self._execute(self.client.table("revenue_events").insert(data))
     
     # Token balance operations
     async def create_token_balance(self, customer_id: str, initial_balance: int = 0):
@@ -123,76 +205,132 @@ class SupabaseClient:
             "lifetime_earned": initial_balance,
             "lifetime_spent": 0
         }
-        return self.client.table("token_balances").insert(data).execute()
+        return await self._execute(self.client.table("token_balances").insert(data))
     
     async def get_token_balance(self, customer_id: str) -> Optional[Dict]:
         """Get token balance for customer"""
-        result = self.client.table("token_balances").select("*").eq("customer_id", customer_id).execute()
+        result = await self._execute(self.client.table("token_balances").select("*").eq("customer_id", customer_id).limit(1))
         return result.data[0] if result.data else None
     
     async def credit_tokens(self, customer_id: str, amount: int, description: str, 
                            transaction_type: str = "purchase", reference_id: str = None,
                            reference_type: str = None) -> str:
         """Credit tokens to customer using database function"""
-        result = self.client.rpc("credit_tokens", {
+        result = await self._execute(self.client.rpc("credit_tokens", {
             "p_customer_id": customer_id,
             "p_amount": amount,
             "p_type": transaction_type,
             "p_description": description,
             "p_reference_id": reference_id,
             "p_reference_type": reference_type
-        }).execute()
+        }))
         return result.data if result.data else None
     
     async def debit_tokens(self, customer_id: str, amount: int, description: str,
                           reference_id: str = None, reference_type: str = None):
         """Debit tokens from customer using database function"""
-        result = self.client.rpc("debit_tokens", {
+        result = await self._execute(self.client.rpc("debit_tokens", {
+            "p_customer_id": customer_id,
+            "p_amount": amount,
+            "p_description": description,
+            "p_reference_id": reference_id,
+            "p_reference_type": reference_type
+        }))
+        return result.data if result.data else None
+    
+    async def debit_tokens_and_log(self, customer_id: str, amount: int, description: str,
+                                   chat: Dict, reference_id: str = None, reference_type: str = None):
+        """Debit tokens if the balance covers them and always log the chat, in one database transaction"""
+        result = await self._execute(self.client.rpc("debit_tokens_and_log", {
             "p_customer_id": customer_id,
             "p_amount": amount,
             "p_description": description,
+            "p_chat": chat,
             "p_reference_id": reference_id,
             "p_reference_type": reference_type
-        }).execute()
+        }))
         return result.data if result.data else None
     
     async def use_tokens(self, customer_id: str, amount: int, description: str,
                         reference_id: str = None, reference_type: str = None):
         """Use/deduct tokens atomically"""
-        result = self.client.rpc("use_tokens", {
+        result = await self._execute(self.client.rpc("use_tokens", {
             "p_customer_id": customer_id,
             "p_amount": amount,
             "p_description": description,
             "p_reference_id": reference_id,
             "p_reference_type": reference_type
-        }).execute()
+        }))
         return result.data if result.data else None
     
     async def get_token_transactions(self, customer_id: str, limit: int = 50) -> List[Dict]:
         """Get token transactions for customer"""
-        result = self.client.table("token_transactions")\
-            .select("*")\
-            .eq("customer_id", customer_id)\
-            .order("created_at", desc=True)\
-            .limit(limit)\
-            .execute()
+        result = await self._execute(
+            self.client.table("token_transactions")
+            .select("*")
+            .eq("customer_id", customer_id)
+            .order("created_at", desc=True)
+            .limit(limit)
+        )
         return result.data or []
     
+    async def iter_token_transactions(self, customer_id: str, batch_size: int = 500) -> AsyncIterator[Dict]:
+        """Stream all token transactions for customer, newest first, one page at a time"""
+        last = None
+        while True:
+            # Keyset paging on (created_at, id): rows inserted mid-walk don't
+            # shift later pages, and equal timestamps keep a fixed order
+            query = (
+                self.client.table("token_transactions")
+                .select("*")
+                .eq("customer_id", customer_id)
+                .order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(batch_size)
+            )
+            if last is not None:
+                query = query.or_(
+                    f'created_at.lt."{last["created_at"]}",'
+                    f'and(created_at.eq."{last["created_at"]}",id.lt.{last["id"]})'
+                )
+            result = await self._execute(query)
+            rows = result.data or []
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+    
     async def create_token_order(self, data: Dict):
         """Create token order record"""
-        return self.client.table("token_orders").insert(data).execute()
+        return await self._execute(self.client.table("token_orders").insert(data))
+    
+    async def get_token_order_by_session(self, session_id: str) -> Optional[Dict]:
+        """Get token order by Stripe checkout session ID"""
+        result = await self._execute(
+            self.client.table("token_orders")
+            .select("*")
+            .eq("stripe_checkout_session_id", session_id)
+            .limit(1)
+        )
+        return result.data[0] if result.data else None
+    
+    async def update_token_order(self, order_id: str, data: Dict):
+        """Update token order record"""
+        return await self._execute(self.client.table("token_orders").update(data).eq("id", order_id))
     
     async def get_customer_token_orders(self, customer_id: str) -> List[Dict]:
         """Get token orders for customer"""
-        result = self.client.table("token_orders")\
-            .select("*")\
-            .eq("customer_id", customer_id)\
-            .order("created_at", desc=True)\
-            .execute()
+        result = await self._execute(
+            self.client.table("token_orders")
+            .select("*")
+            .eq("customer_id", customer_id)
+            .order("created_at", desc=True)
+        )
         return result.data or []
     
     # Demo helpers
     async def get_demo_customers(self) -> List[Dict]:
         """Get all demo customers"""
-        result = self.client.table("customers").select("*").eq("email", "demo@cleaneats.com").execute()
+        result = await self._execute(self.client.table("customers").select("*").eq("email", "demo@cleaneats.com"))
         return result.data or []
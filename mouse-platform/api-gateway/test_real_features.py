@@ -5,10 +5,11 @@ Tests real implementations (not mocks)
 import pytest
 import asyncio
 import os
+import httpx
 from datetime import datetime
 
 # Import the modules to test
-from ai_agents import KingMouseAgent, KnightAgent, MoonshotClient
+from ai_agents import KingMouseAgent, KnightAgent, MoonshotClient, MOONSHOT_TIMEOUT
 from orchestrator import MousePlatform, StripeClient, TelegramAPIClient
 from telegram_bot import TelegramBot, TelegramBotManager
 
@@ -19,22 +20,41 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
 
+# One Moonshot connection pool for the whole session, on the session event loop
+@pytest.fixture(scope="session")
+async def moonshot_client():
+    client = MoonshotClient(http_client=httpx.AsyncClient(timeout=MOONSHOT_TIMEOUT))
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+def king_mouse_agent(moonshot_client):
+    # Fresh agent per test (it keeps conversation history), shared Moonshot client
+    agent = KingMouseAgent(
+        company_name="Test Co",
+        plan="starter",
+        customer_id="test_123"
+    )
+    agent.moonshot = moonshot_client
+    return agent
+
+
 class TestMoonshotClient:
     """Tests for Moonshot AI integration"""
     
     @pytest.mark.asyncio
-    async def test_chat_completion(self):
+    async def test_chat_completion(self, moonshot_client):
         """Test that Moonshot API returns valid responses"""
         if not MOONSHOT_API_KEY:
             pytest.skip("MOONSHOT_API_KEY not set")
         
-        client = MoonshotClient()
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Say 'Hello from Moonshot' and nothing else."}
         ]
         
-        response = await client.chat_completion(messages, max_tokens=50)
+        response = await moonshot_client.chat_completion(messages, max_tokens=50)
         
         assert "choices" in response
         assert len(response["choices"]) > 0
@@ -43,12 +63,11 @@ class TestMoonshotClient:
         assert "Hello" in content or "Moonshot" in content
     
     @pytest.mark.asyncio
-    async def test_chat_completion_with_tools(self):
+    async def test_chat_completion_with_tools(self, moonshot_client):
         """Test function calling capability"""
         if not MOONSHOT_API_KEY:
             pytest.skip("MOONSHOT_API_KEY not set")
         
-        client = MoonshotClient()
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Deploy a web developer to build a website"}
@@ -71,7 +90,7 @@ class TestMoonshotClient:
             }
         ]
         
-        response = await client.chat_completion(messages, tools=tools)
+        response = await moonshot_client.chat_completion(messages, tools=tools)
         
         assert "choices" in response
         # AI may or may not use the tool depending on its interpretation
@@ -81,15 +100,9 @@ class TestKingMouseAgent:
     """Tests for King Mouse AI agent"""
     
     @pytest.mark.asyncio
-    async def test_process_message_web_request(self):
+    async def test_process_message_web_request(self, king_mouse_agent):
         """Test processing a web development request"""
-        agent = KingMouseAgent(
-            company_name="Test Co",
-            plan="starter",
-            customer_id="test_123"
-        )
-        
-        response = await agent.process_message("I need a website for my business")
+        response = await king_mouse_agent.process_message("I need a website for my business")
         
         assert "message" in response
         assert response["action"] == "deploy_employee"
@@ -98,30 +111,18 @@ class TestKingMouseAgent:
         assert "task_description" in response
     
     @pytest.mark.asyncio
-    async def test_process_message_sales_request(self):
+    async def test_process_message_sales_request(self, king_mouse_agent):
         """Test processing a sales request"""
-        agent = KingMouseAgent(
-            company_name="Test Co",
-            plan="starter",
-            customer_id="test_123"
-        )
-        
-        response = await agent.process_message("I need help with sales outreach")
+        response = await king_mouse_agent.process_message("I need help with sales outreach")
         
         assert "message" in response
         assert response["action"] == "deploy_employee"
         assert response["role"] == "sales_rep"
     
     @pytest.mark.asyncio
-    async def test_process_message_general_inquiry(self):
+    async def test_process_message_general_inquiry(self, king_mouse_agent):
         """Test processing a general inquiry"""
-        agent = KingMouseAgent(
-            company_name="Test Co",
-            plan="starter",
-            customer_id="test_123"
-        )
-        
-        response = await agent.process_message("What can you do?")
+        response = await king_mouse_agent.process_message("What can you do?")
         
         assert "message" in response
         # Should either have no action or use AI to respond
@@ -2,10 +2,10 @@
 Token Pricing Configuration
 Manages token pricing tiers and usage rates
 """
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TokenPackage:
     """Token package definition"""
     id: str
@@ -17,30 +17,32 @@ class TokenPackage:
     features: List[str]
     stripe_price_id: Optional[str] = None
     
+    # Derived from the fields above once in __post_init__ (packages are immutable)
+    display_price: str = field(init=False, repr=False, compare=False)  # e.g. "$49"
+    price_per_token: float = field(init=False, repr=False, compare=False)  # cents
+    price_per_1000_tokens: float = field(init=False, repr=False, compare=False)  # dollars
+    display_tokens: str = field(init=False, repr=False, compare=False)  # e.g. "12,000"
+    display_price_per_1000: str = field(init=False, repr=False, compare=False)  # e.g. "$4.08"
+    
+    def __post_init__(self):
+        """Precompute the per-token prices and display strings"""
+        object.__setattr__(self, "display_price", f"${self.price_cents / 100:.0f}")
+        if self.token_amount == 0:
+            object.__setattr__(self, "price_per_token", 0)
+            object.__setattr__(self, "price_per_1000_tokens", 0)
+        else:
+            object.__setattr__(self, "price_per_token", self.price_cents / self.token_amount)
+            object.__setattr__(self, "price_per_1000_tokens", (self.price_cents / 100) / (self.token_amount / 1000))
+        object.__setattr__(self, "display_tokens", f"{self.token_amount:,}")
+        object.__setattr__(self, "display_price_per_1000", f"${self.price_per_1000_tokens:.2f}")
+    
     @property
     def total_tokens(self) -> int:
         """Total tokens"""
         return self.token_amount
-    
-    @property
-    def display_price(self) -> str:
-        """Formatted price string"""
-        return f"${self.price_cents / 100:.0f}"
-    
-    @property
-    def price_per_token(self) -> float:
-        """Effective price per token in cents"""
-        if self.total_tokens == 0:
-            return 0
-        return self.price_cents / self.total_tokens
-    
-    @property
-    def price_per_1000_tokens(self) -> float:
-        """Price per 1000 tokens"""
-        return (self.price_cents / 100) / (self.total_tokens / 1000)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TokenRate:
     """Token usage rate for an action"""
     action_type: str
@@ -145,6 +147,17 @@ class TokenPricingConfig:
         )
     }
     
+    # Static views of PACKAGES/RATES returned by the getters below
+    _PUBLIC_PACKAGES = tuple(pkg for pkg in PACKAGES.values() if pkg.slug != "enterprise")
+    _ALL_RATES = tuple(RATES.values())
+    
+    # Per-action token costs, read once so the calculators below skip the dict lookup
+    _MESSAGE_TOKENS = RATES["message_king_mouse"].tokens
+    _DEPLOY_TOKENS = RATES["deploy_ai_employee"].tokens
+    _VM_HOUR_TOKENS = RATES["vm_runtime_1h"].tokens
+    _EMAIL_TOKENS = RATES["process_email"].tokens
+    _API_CALL_TOKENS = RATES["api_call"].tokens
+    
     # Low balance threshold
     LOW_BALANCE_THRESHOLD = 500
     
@@ -154,9 +167,9 @@ class TokenPricingConfig:
         return cls.PACKAGES.get(slug)
     
     @classmethod
-    def get_all_packages(cls) -> List[TokenPackage]:
+    def get_all_packages(cls) -> Tuple[TokenPackage, ...]:
         """Get all token packages (excluding enterprise)"""
-        return [pkg for pkg in cls.PACKAGES.values() if pkg.slug != "enterprise"]
+        return cls._PUBLIC_PACKAGES
     
     @classmethod
     def get_rate(cls, action_type: str) -> Optional[TokenRate]:
@@ -164,34 +177,39 @@ class TokenPricingConfig:
         return cls.RATES.get(action_type)
     
     @classmethod
-    def get_all_rates(cls) -> List[TokenRate]:
+    def get_all_rates(cls) -> Tuple[TokenRate, ...]:
         """Get all token rates"""
-        return list(cls.RATES.values())
+        return cls._ALL_RATES
     
     @classmethod
     def calculate_message_cost(cls, count: int = 1) -> int:
         """Calculate token cost for messages"""
-        return count * cls.RATES["message_king_mouse"].tokens
+        return count * cls._MESSAGE_TOKENS
     
     @classmethod
     def calculate_deploy_cost(cls, count: int = 1) -> int:
         """Calculate token cost for deploying employees"""
-        return count * cls.RATES["deploy_ai_employee"].tokens
+        return count * cls._DEPLOY_TOKENS
     
     @classmethod
     def calculate_vm_cost(cls, hours: float) -> int:
-        """Calculate token cost for VM runtime (hours)"""
-        return int(hours * cls.RATES["vm_runtime_1h"].tokens)
+        """Calculate token cost for VM runtime (hours, billed per whole minute)"""
+        return cls.calculate_vm_cost_minutes(int(hours * 60))
+    
+    @classmethod
+    def calculate_vm_cost_minutes(cls, minutes: int) -> int:
+        """Calculate token cost for VM runtime (whole minutes, integer math)"""
+        return minutes * cls._VM_HOUR_TOKENS // 60
     
     @classmethod
     def calculate_email_cost(cls, count: int = 1) -> int:
         """Calculate token cost for processing emails"""
-        return count * cls.RATES["process_email"].tokens
+        return count * cls._EMAIL_TOKENS
     
     @classmethod
     def calculate_api_cost(cls, count: int = 1) -> int:
         """Calculate token cost for API calls"""
-        return count * cls.RATES["api_call"].tokens
+        return count * cls._API_CALL_TOKENS
     
     @classmethod
     def is_low_balance(cls, balance: int) -> bool:
@@ -199,26 +217,36 @@ class TokenPricingConfig:
         return balance < cls.LOW_BALANCE_THRESHOLD
     
     @classmethod
-    def get_comparison_table(cls) -> List[Dict]:
-        """Get pricing comparison table for UI"""
+    def get_comparison_table(cls) -> Tuple[Dict, ...]:
+        """Get pricing comparison table for UI (shared, treat as read-only)"""
+        return cls._COMPARISON_TABLE
+    
+    @classmethod
+    def get_action_costs_table(cls) -> Tuple[Dict, ...]:
+        """Get action costs table for UI (shared, treat as read-only)"""
+        return cls._ACTION_COSTS_TABLE
+    
+    @classmethod
+    def _build_comparison_table(cls) -> Tuple[Dict, ...]:
+        """Build the pricing comparison table from PACKAGES"""
         packages = []
         for pkg in cls.PACKAGES.values():
             pkg_data = {
                 "id": pkg.slug,
                 "name": pkg.name,
                 "price": pkg.display_price if pkg.price_cents > 0 else "Custom",
-                "tokens": f"{pkg.total_tokens:,}" if pkg.token_amount > 0 else "Custom",
+                "tokens": pkg.display_tokens if pkg.token_amount > 0 else "Custom",
                 "features": pkg.features,
                 "popular": pkg.slug == "growth",
-                "price_per_1000": f"${pkg.price_per_1000_tokens:.2f}" if pkg.token_amount > 0 else "Custom"
+                "price_per_1000": pkg.display_price_per_1000 if pkg.token_amount > 0 else "Custom"
             }
             packages.append(pkg_data)
-        return packages
+        return tuple(packages)
     
     @classmethod
-    def get_action_costs_table(cls) -> List[Dict]:
-        """Get action costs table for UI"""
-        return [
+    def _build_action_costs_table(cls) -> Tuple[Dict, ...]:
+        """Build the action costs table from RATES"""
+        return (
             {
                 "action": "Message King Mouse",
                 "cost": f"{cls.RATES['message_king_mouse'].tokens} tokens",
@@ -244,4 +272,45 @@ class TokenPricingConfig:
                 "cost": f"{cls.RATES['api_call'].tokens} token",
                 "description": "Per API request"
             }
-        ]
+        )
+
+
+# PACKAGES and RATES are static, so the UI tables are built once at import
+TokenPricingConfig._COMPARISON_TABLE = TokenPricingConfig._build_comparison_table()
+TokenPricingConfig._ACTION_COSTS_TABLE = TokenPricingConfig._build_action_costs_table()
+
+# Function forms of the calculators for hot billing paths (no class/descriptor lookup)
+_MESSAGE_TOKENS = TokenPricingConfig._MESSAGE_TOKENS
+_DEPLOY_TOKENS = TokenPricingConfig._DEPLOY_TOKENS
+_VM_HOUR_TOKENS = TokenPricingConfig._VM_HOUR_TOKENS
+_EMAIL_TOKENS = TokenPricingConfig._EMAIL_TOKENS
+_API_CALL_TOKENS = TokenPricingConfig._API_CALL_TOKENS
+_LOW_BALANCE_THRESHOLD = TokenPricingConfig.LOW_BALANCE_THRESHOLD
+
+def calculate_message_cost(count: int = 1) -> int:
+    """Calculate token cost for messages"""
+    return count * _MESSAGE_TOKENS
+
+def calculate_deploy_cost(count: int = 1) -> int:
+    """Calculate token cost for deploying employees"""
+    return count * _DEPLOY_TOKENS
+
+def calculate_vm_cost(hours: float) -> int:
+    """Calculate token cost for VM runtime (hours, billed per whole minute)"""
+    return int(hours * 60) * _VM_HOUR_TOKENS // 60
+
+def calculate_vm_cost_minutes(minutes: int) -> int:
+    """Calculate token cost for VM runtime (whole minutes, integer math)"""
+    return minutes * _VM_HOUR_TOKENS // 60
+
+def calculate_email_cost(count: int = 1) -> int:
+    """Calculate token cost for processing emails"""
+    return count * _EMAIL_TOKENS
+
+def calculate_api_cost(count: int = 1) -> int:
+    """Calculate token cost for API calls"""
+    return count * _API_CALL_TOKENS
+
+def is_low_balance(balance: int) -> bool:
+    """Check if balance is low"""
+    return balance < _LOW_BALANCE_THRESHOLD
@@ -6,18 +6,59 @@ Sets up webhooks for Mouse Platform
 
 import os
 import sys
+import json
 import argparse
+from pathlib import Path
 
-try:
-    import stripe
-except ImportError:
-    print("❌ stripe package not installed. Run: pip install stripe")
-    sys.exit(1)
+# Webhook URL -> endpoint ID, so repeat runs can fetch the endpoint directly
+CACHE_FILE = Path.home() / ".mouse-platform" / "stripe-webhooks.json"
+
+def load_endpoint_cache() -> dict:
+    """Load the cached webhook endpoint IDs"""
+    try:
+        return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_endpoint_cache(cache: dict):
+    """Save the cached webhook endpoint IDs (best effort)"""
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️  Could not write endpoint cache {CACHE_FILE}: {e}")
+
+def import_stripe(api_key: str):
+    """Import the Stripe SDK on first use, so --help and argument errors stay fast"""
+    try:
+        import stripe
+    except ImportError:
+        print("❌ stripe package not installed. Run: pip install stripe")
+        sys.exit(1)
+    
+    stripe.api_key = api_key
+    return stripe
+
+def find_endpoint(stripe, endpoint_url: str, cache: dict):
+    """Find the webhook endpoint for a URL, trying the cached ID before listing"""
+    cached_id = cache.get(endpoint_url)
+    if cached_id:
+        try:
+            endpoint = stripe.WebhookEndpoint.retrieve(cached_id)
+            if endpoint.url == endpoint_url:
+                return endpoint
+        except stripe.error.InvalidRequestError:
+            pass  # deleted, or created under another account; fall back to listing
+    
+    # Stripe caps accounts well below 100 endpoints, so a single page covers them all
+    existing = stripe.WebhookEndpoint.list(limit=100).data
+    by_url = {e.url: e for e in existing}
+    return by_url.get(endpoint_url)
 
 def configure_webhooks(api_key: str, endpoint_url: str):
     """Configure Stripe webhooks for production"""
     
-    stripe.api_key = api_key
+    stripe = import_stripe(api_key)
     
     # Webhook events to subscribe to
     events = [
@@ -29,23 +70,29 @@ def configure_webhooks(api_key: str, endpoint_url: str):
         "customer.created",
         "checkout.session.completed"
     ]
+    events = sorted(set(events))
     
     try:
         # Check if webhook endpoint already exists
-        existing = stripe.WebhookEndpoint.list(limit=10)
-        
-        for endpoint in existing.auto_paging_iter():
-            if endpoint.url == endpoint_url:
-                print(f"⚠️  Webhook endpoint already exists: {endpoint.id}")
+        cache = load_endpoint_cache()
+        endpoint = find_endpoint(stripe, endpoint_url, cache)
+        if endpoint is not None:
+            print(f"⚠️  Webhook endpoint already exists: {endpoint.id}")
+            
+            if set(endpoint.enabled_events) == set(events):
+                print("✅ Enabled events already up to date")
+            else:
                 print(f"   Updating enabled events...")
-                
                 stripe.WebhookEndpoint.modify(
                     endpoint.id,
                     enabled_events=events
                 )
                 print(f"✅ Updated webhook endpoint")
-                print(f"   Secret: {endpoint.secret}")
-                return endpoint.secret
+            if cache.get(endpoint_url) != endpoint.id:
+                cache[endpoint_url] = endpoint.id
+                save_endpoint_cache(cache)
+            print(f"   Secret: {endpoint.secret}")
+            return endpoint.secret
         
         # Create new webhook endpoint
         print(f"Creating new webhook endpoint: {endpoint_url}")
@@ -56,6 +103,8 @@ def configure_webhooks(api_key: str, endpoint_url: str):
         )
         
         print(f"✅ Webhook endpoint created: {endpoint.id}")
+        cache[endpoint_url] = endpoint.id
+        save_endpoint_cache(cache)
         print(f"   Secret: {endpoint.secret}")
         print("")
         print("⚠️  IMPORTANT: Save this webhook secret!")
@@ -69,7 +118,7 @@ def configure_webhooks(api_key: str, endpoint_url: str):
 
 def test_webhook(api_key: str, endpoint_url: str):
     """Send a test webhook event"""
-    stripe.api_key = api_key
+    import_stripe(api_key)
     
     try:
         # Create a test event
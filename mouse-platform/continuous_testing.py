@@ -6,13 +6,29 @@ Runs end-to-end tests every 30 minutes, finds bugs, reports them, and attempts f
 
 import os
 import sys
+import io
+import ast
 import time
 import json
-import subprocess
+import hashlib
+import signal
 import logging
+import threading
+import contextlib
+import importlib
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib json module
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,255 +44,366 @@ logger = logging.getLogger(__name__)
 TEST_INTERVAL_MINUTES = 30
 PLATFORM_DIR = Path(__file__).parent
 TESTS_DIR = PLATFORM_DIR / 'tests'
-RESULTS_FILE = PLATFORM_DIR / 'continuous_test_results.json'
+RESULTS_FILE = PLATFORM_DIR / 'continuous_test_results.jsonl'  # one run per line
+MAX_STORED_RUNS = 200  # older runs are dropped when the file is compacted
+MAX_REPORT_FILES = 48  # a day of 30-minute cycles
+RUN_LOGS_DIR = PLATFORM_DIR / 'runs'  # full pytest output of failing runs, same retention as reports
 BUGS_FILE = PLATFORM_DIR / 'bugs_found.json'
+REPORT_FILE = PLATFORM_DIR / 'test_report.json'
+FIX_STATE_FILE = PLATFORM_DIR / 'applied_fixes.json'  # fix_file -> {sha256, applied fix IDs}
+
+# Project code is re-imported on every run so edits (including our own fixes) are picked up
+PROJECT_DIRS = (str(TESTS_DIR), str(PLATFORM_DIR / 'api-gateway'))
+
+# Verification re-runs cover only the failed tests; the full suite is re-run after a
+# fix with a broad blast radius, or on every FULL_VERIFY_EVERY-th verification
+FULL_VERIFY_EVERY = 10
+
+# Third-party imports kept warm in the test worker between runs
+WARM_MODULES = ('fastapi', 'fastapi.testclient', 'pydantic', 'httpx', 'stripe', 'supabase')
 
-def run_tests():
-    """Run all tests and return results"""
+_executor = None
+
+def _warm_worker():
+    """Import heavy test dependencies once per worker process"""
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+def _run_pytest_worker(targets, report_path):
+    """Run pytest on targets in the worker process and return (exit code, captured output)"""
+    for name, module in list(sys.modules.items()):
+        if (getattr(module, '__file__', None) or '').startswith(PROJECT_DIRS):
+            del sys.modules[name]
+    
+    Path(report_path).unlink(missing_ok=True)  # never read a previous run's report
+    saved_path = list(sys.path)  # conftest.py inserts entries on every import
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            exit_code = pytest.main([
+                *targets, '-v', '--tb=line',
+                '--json-report', f'--json-report-file={report_path}'
+            ])
+    finally:
+        sys.path[:] = saved_path
+    
+    return int(exit_code), output.getvalue()
+
+def _get_executor():
+    """Get the long-lived pytest worker, starting it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=1, initializer=_warm_worker)
+    return _executor
+
+def _reset_executor():
+    """Discard the pytest worker so the next run starts a fresh one"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def run_tests(now, nodeids=None, name='run'):
+    """Run the given test node IDs (default: all tests) for the cycle started at now and return results"""
     logger.info("=" * 60)
-    logger.info("Running test suite...")
+    if nodeids:
+        logger.info(f"Running {len(nodeids)} selected tests...")
+        # Node IDs are relative to the pytest rootdir, not to our working directory
+        targets = [str(PLATFORM_DIR / nodeid) for nodeid in nodeids]
+    else:
+        logger.info("Running test suite...")
+        targets = [str(TESTS_DIR)]
     
     try:
-        # Activate venv and run tests
-        result = subprocess.run(
-            ['bash', '-c', f'source {PLATFORM_DIR}/venv/bin/activate && python -m pytest {TESTS_DIR} -v --tb=line --json-report --json-report-file={PLATFORM_DIR}/test_report.json 2>&1'],
-            capture_output=True,
-            text=True,
-            cwd=PLATFORM_DIR
-        )
-        
-        # Parse test results
-        output = result.stdout + result.stderr
-        
-        # Count passes and failures
-        passed = output.count('PASSED')
-        failed = output.count('FAILED')
-        errors = output.count('ERROR')
+        # Run pytest in a reused worker process (same interpreter as this script)
+        return_code, output = _get_executor().submit(_run_pytest_worker, targets, REPORT_FILE).result()
+        
+        # Read counts and failing tests from the pytest JSON report
+        report = load_test_report()
+        summary = report.get('summary', {})
+        passed = summary.get('passed', 0)
+        failed = summary.get('failed', 0)
+        errors = summary.get('error', 0)
+        if not report and return_code != 0:
+            errors = 1  # pytest exited before it could write a report
+        failed_tests = [t['nodeid'] for t in report.get('tests', []) if t.get('outcome') in ('failed', 'error')]
         
         logger.info(f"Tests complete: {passed} passed, {failed} failed, {errors} errors")
         
-        return {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+        results = {
+            'timestamp': now.isoformat(),
             'passed': passed,
             'failed': failed,
             'errors': errors,
-            'return_code': result.returncode,
-            'output': output[-2000:] if len(output) > 2000 else output  # Last 2000 chars
+            'failed_tests': failed_tests,
+            'return_code': return_code
         }
+        if return_code != 0:
+            # Keep the full output on disk for debugging, not in the results history
+            results['log_file'] = save_run_log(output, f'{now:%Y%m%d_%H%M%S}_{name}')
+        return results
         
     except Exception as e:
         logger.error(f"Error running tests: {e}")
+        _reset_executor()
         return {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now.isoformat(),
             'error': str(e),
             'return_code': -1
         }
 
+def merge_verify_results(full_results, verify_results):
+    """Fold a re-run of the full run's failing tests back into whole-suite results"""
+    rerun = full_results.get('failed_tests', [])
+    if 'error' in verify_results or not rerun:
+        return verify_results  # incomplete run, or it already covered the whole suite
+    merged = dict(verify_results)
+    # Tests outside the re-run kept their outcome from the full run (all passed)
+    merged['passed'] = full_results.get('passed', 0) + verify_results.get('passed', 0)
+    merged['rerun'] = len(rerun)
+    return merged
+
+# Known bug patterns, keyed by bug ID; 'pattern' is the test that exposes it
+BUG_PATTERNS = {
+    'screenshot_endpoint_allows_owner': {
+        'pattern': 'test_screenshot_endpoint_allows_owner',
+        'severity': 'CRITICAL',
+        'description': 'Screenshot endpoint returns 500 error for valid owner',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'cors_restricted_in_production': {
+        'pattern': 'test_cors_restricted_in_production',
+        'severity': 'HIGH',
+        'description': 'CORS allows all origins (*) - security risk',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'customer_create_input_validation': {
+        'pattern': 'test_customer_create_input_validation',
+        'severity': 'HIGH',
+        'description': 'No input validation on customer creation data',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'customer_create_company_name_length': {
+        'pattern': 'test_customer_create_company_name_length',
+        'severity': 'MEDIUM',
+        'description': 'No length validation on company name field',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'api_key_header_required': {
+        'pattern': 'test_api_key_header_required_for_sensitive_endpoints',
+        'severity': 'CRITICAL',
+        'description': 'Admin endpoints do not require authentication',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'sql_injection_protection': {
+        'pattern': 'test_sql_injection_protection',
+        'severity': 'CRITICAL',
+        'description': 'SQL injection vulnerability detected',
+        'fix_file': 'api-gateway/supabase_client.py'
+    },
+    'error_messages_leak_info': {
+        'pattern': 'test_error_messages_dont_leak_internal_info',
+        'severity': 'HIGH',
+        'description': 'Error messages expose internal database credentials',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'stripe_webhook_signature': {
+        'pattern': 'test_stripe_webhook_signature_validation',
+        'severity': 'CRITICAL',
+        'description': 'Stripe webhook signature not validated',
+        'fix_file': 'api-gateway/main.py'
+    },
+    'telegram_webhook_secret': {
+        'pattern': 'test_telegram_webhook_secret_validation',
+        'severity': 'HIGH',
+        'description': 'Telegram webhook lacks secret validation',
+        'fix_file': 'api-gateway/main.py'
+    }
+}
+
+# Test name -> bug ID, so each failing test is one dict lookup
+BUG_TESTS = {info['pattern']: bug_id for bug_id, info in BUG_PATTERNS.items()}
+
+# Fixes that touch code shared by most endpoints; verifying them needs the full suite
+BROAD_FIXES = frozenset({'error_messages_leak_info'})
+
+def json_loads(data):
+    """Parse JSON text or bytes, using orjson when available"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj, indent=False):
+    """Serialize to a JSON string, using orjson when available"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None)
+
+def load_test_report():
+    """Load the JSON report written by the last pytest run"""
+    try:
+        with open(REPORT_FILE, 'rb') as f:
+            return json_loads(f.read())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read test report: {e}")
+        return {}
+
 def load_bugs():
     """Load previously found bugs"""
     if BUGS_FILE.exists():
-        with open(BUGS_FILE, 'r') as f:
-            return json.load(f)
+        with open(BUGS_FILE, 'rb') as f:
+            return json_loads(f.read())
     return {'bugs': [], 'fixed': [], 'total_found': 0}
 
 def save_bugs(bugs_data):
     """Save bugs to file"""
-    with open(BUGS_FILE, 'w') as f:
-        json.dump(bugs_data, f, indent=2)
+    with open(BUGS_FILE, 'w', encoding='utf-8') as f:
+        f.write(json_dumps(bugs_data, indent=True))
+
+_runs_on_disk = 0
 
 def load_results():
-    """Load previous test results"""
+    """Load the most recent test runs"""
+    global _runs_on_disk
+    recent_runs = deque(maxlen=MAX_STORED_RUNS)
+    _runs_on_disk = 0
     if RESULTS_FILE.exists():
-        with open(RESULTS_FILE, 'r') as f:
-            return json.load(f)
-    return {'runs': []}
+        with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    recent_runs.append(json_loads(line))
+                    _runs_on_disk += 1
+    return recent_runs
 
-def save_results(results_data):
-    """Save test results"""
-    with open(RESULTS_FILE, 'w') as f:
-        json.dump(results_data, f, indent=2)
+def save_results(recent_runs):
+    """Rewrite the results file with only the most recent runs"""
+    global _runs_on_disk
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        f.writelines(json_dumps(run) + '\n' for run in recent_runs)
+    _runs_on_disk = len(recent_runs)
 
-def analyze_failures(test_output):
-    """Analyze test output to identify specific bugs"""
-    bugs = []
+def append_result(recent_runs, results):
+    """Record one run, compacting the file once it holds twice MAX_STORED_RUNS"""
+    global _runs_on_disk
+    recent_runs.append(results)
     
-    # Known bug patterns
-    bug_patterns = {
-        'screenshot_endpoint_allows_owner': {
-            'pattern': 'test_screenshot_endpoint_allows_owner',
-            'severity': 'CRITICAL',
-            'description': 'Screenshot endpoint returns 500 error for valid owner',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'cors_restricted_in_production': {
-            'pattern': 'test_cors_restricted_in_production',
-            'severity': 'HIGH',
-            'description': 'CORS allows all origins (*) - security risk',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'customer_create_input_validation': {
-            'pattern': 'test_customer_create_input_validation',
-            'severity': 'HIGH',
-            'description': 'No input validation on customer creation data',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'customer_create_company_name_length': {
-            'pattern': 'test_customer_create_company_name_length',
-            'severity': 'MEDIUM',
-            'description': 'No length validation on company name field',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'api_key_header_required': {
-            'pattern': 'test_api_key_header_required_for_sensitive_endpoints',
-            'severity': 'CRITICAL',
-            'description': 'Admin endpoints do not require authentication',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'sql_injection_protection': {
-            'pattern': 'test_sql_injection_protection',
-            'severity': 'CRITICAL',
-            'description': 'SQL injection vulnerability detected',
-            'fix_file': 'api-gateway/supabase_client.py'
-        },
-        'error_messages_leak_info': {
-            'pattern': 'test_error_messages_dont_leak_internal_info',
-            'severity': 'HIGH',
-            'description': 'Error messages expose internal database credentials',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'stripe_webhook_signature': {
-            'pattern': 'test_stripe_webhook_signature_validation',
-            'severity': 'CRITICAL',
-            'description': 'Stripe webhook signature not validated',
-            'fix_file': 'api-gateway/main.py'
-        },
-        'telegram_webhook_secret': {
-            'pattern': 'test_telegram_webhook_secret_validation',
-            'severity': 'HIGH',
-            'description': 'Telegram webhook lacks secret validation',
-            'fix_file': 'api-gateway/main.py'
-        }
-    }
-    
-    for bug_id, bug_info in bug_patterns.items():
-        if bug_info['pattern'] in test_output:
-            bugs.append({
-                'id': bug_id,
-                'severity': bug_info['severity'],
-                'description': bug_info['description'],
-                'fix_file': bug_info['fix_file'],
-                'found_at': datetime.now(timezone.utc).isoformat(),
-                'status': 'open'
-            })
-    
-    return bugs
+    if _runs_on_disk >= 2 * MAX_STORED_RUNS:
+        save_results(recent_runs)
+        return
+    with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+        f.write(json_dumps(results) + '\n')
+    _runs_on_disk += 1
 
-def attempt_fix_cors():
-    """Fix CORS configuration to restrict origins"""
-    logger.info("Attempting to fix CORS configuration...")
-    
-    main_file = PLATFORM_DIR / 'api-gateway' / 'main.py'
-    
+def save_run_log(output, name):
+    """Write one run's pytest output to RUN_LOGS_DIR/<name>.log and return the file path"""
+    log_file = RUN_LOGS_DIR / f'{name}.log'
     try:
-        with open(main_file, 'r') as f:
-            content = f.read()
-        
-        # Check if already fixed
-        if 'https://app.mouseplatform.com' in content:
-            logger.info("CORS already fixed")
-            return True
-        
-        # Replace CORS configuration
-        old_cors = '''app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)'''
-        
-        new_cors = '''app.add_middleware(
-    CORSMiddleware,
-    allow_origins=os.getenv("ALLOWED_ORIGINS", "https://app.mouseplatform.com,https://admin.mouseplatform.com,http://localhost:3000").split(","),
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
-)'''
-        
-        if old_cors in content:
-            content = content.replace(old_cors, new_cors)
-            with open(main_file, 'w') as f:
-                f.write(content)
-            logger.info("CORS configuration fixed")
-            return True
-        else:
-            logger.warning("Could not find CORS configuration to fix")
-            return False
-            
-    except Exception as e:
-        logger.error(f"Error fixing CORS: {e}")
-        return False
+        RUN_LOGS_DIR.mkdir(exist_ok=True)
+        log_file.write_text(output, encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"Could not save run log: {e}")
+        return None
+    prune_files(RUN_LOGS_DIR, '*.log')
+    return str(log_file)
 
-def attempt_fix_input_validation():
-    """Add input validation to CustomerCreate model"""
-    logger.info("Attempting to fix input validation...")
+def analyze_failures(failed_tests, found_at):
+    """Map failing test node IDs to known bugs, stamped with the found_at ISO time"""
+    bugs = []
+    seen = set()
     
-    main_file = PLATFORM_DIR / 'api-gateway' / 'main.py'
+    for nodeid in failed_tests:
+        # "tests/test_x.py::TestY::test_z[param]" -> "test_z"
+        bug_id = BUG_TESTS.get(nodeid.rsplit('::', 1)[-1].split('[', 1)[0])
+        if bug_id is None or bug_id in seen:
+            continue
+        seen.add(bug_id)
+        bug_info = BUG_PATTERNS[bug_id]
+        bugs.append({
+            'id': bug_id,
+            'severity': bug_info['severity'],
+            'description': bug_info['description'],
+            'fix_file': bug_info['fix_file'],
+            'found_at': found_at,
+            'status': 'open'
+        })
     
+    return bugs
+
+def _paren_end(content, open_idx):
+    """Index just past the ')' matching the '(' at open_idx, or -1"""
+    depth = 0
+    for pos in range(open_idx, len(content)):
+        char = content[pos]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return -1
+
+def _add_param(content, anchor, func_prefix, param):
+    """Append a parameter to the function defined right after anchor"""
+    idx = content.find(anchor)
+    start = content.find(func_prefix, idx) if idx >= 0 else -1
+    if start < 0:
+        return content, False
+    open_idx = start + len(func_prefix) - 1
+    end = _paren_end(content, open_idx)
+    if end < 0:
+        return content, False
+    params = content[open_idx + 1:end - 1].strip()
+    return content[:open_idx + 1] + (f"{params}, {param}" if params else param) + content[end - 1:], True
+
+@functools.lru_cache(maxsize=1)
+def _insert_offset(content):
+    """Offset of the line assigning INSERT_TARGET at module level, or -1"""
+    # Cached so fixers that leave the content unchanged share one parse
     try:
-        with open(main_file, 'r') as f:
-            content = f.read()
-        
-        # Check if already fixed
-        if 'Field(..., min_length' in content:
-            logger.info("Input validation already fixed")
-            return True
-        
-        # Add Field import and update CustomerCreate model
-        old_import = "from pydantic import BaseModel"
-        new_import = "from pydantic import BaseModel, Field, EmailStr"
-        
-        old_model = '''class CustomerCreate(BaseModel):
-    company_name: str
-    email: str
-    plan: str = "token_based"  # Deprecated, kept for compatibility
-    reseller_id: Optional[str] = None'''
-        
-        new_model = '''class CustomerCreate(BaseModel):
+        tree = ast.parse(content)
+    except SyntaxError:
+        return -1
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == INSERT_TARGET for t in node.targets):
+            offset = 0
+            for _ in range(node.lineno - 1):
+                offset = content.index('\n', offset) + 1
+            return offset
+    return -1
+
+def _insert_before_target(content, code):
+    """Insert code just before the INSERT_TARGET assignment; returns (content, ok)"""
+    offset = _insert_offset(content)
+    if offset < 0:
+        return content, False
+    return content[:offset] + code + content[offset:], True
+
+# ========== FIX TEMPLATES ==========
+# Anchors and replacement text used by the fix_* transforms below
+
+CORS_ANCHOR = 'allow_origins=["*"]'
+CORS_CALL = 'app.add_middleware('
+CORS_REPLACEMENTS = (
+    (CORS_ANCHOR, 'allow_origins=os.getenv("ALLOWED_ORIGINS", "https://app.mouseplatform.com,https://admin.mouseplatform.com,http://localhost:3000").split(",")'),
+    ('allow_methods=["*"]', 'allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]'),
+    ('allow_headers=["*"]', 'allow_headers=["Authorization", "Content-Type", "X-Requested-With"]'),
+)
+
+PYDANTIC_IMPORT = "from pydantic import BaseModel\n"
+PYDANTIC_IMPORT_FIXED = "from pydantic import BaseModel, Field, EmailStr\n"
+CUSTOMER_MODEL_ANCHOR = 'class CustomerCreate(BaseModel):'
+CUSTOMER_MODEL_FIXED = '''class CustomerCreate(BaseModel):
     company_name: str = Field(..., min_length=2, max_length=100, description="Company name (2-100 characters)")
     email: EmailStr = Field(..., description="Valid email address")
     plan: str = Field(default="token_based", pattern=r"^(starter|growth|enterprise|token_based)$")
     reseller_id: Optional[str] = Field(None, pattern=r'^[a-zA-Z0-9_-]+$', max_length=50)'''
-        
-        content = content.replace(old_import, new_import)
-        content = content.replace(old_model, new_model)
-        
-        with open(main_file, 'w') as f:
-            f.write(content)
-        logger.info("Input validation fixed")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error fixing input validation: {e}")
-        return False
 
-def attempt_fix_admin_auth():
-    """Add authentication requirement to admin endpoints"""
-    logger.info("Attempting to fix admin endpoint authentication...")
-    
-    main_file = PLATFORM_DIR / 'api-gateway' / 'main.py'
-    
-    try:
-        with open(main_file, 'r') as f:
-            content = f.read()
-        
-        # Check if already fixed
-        if 'ADMIN_API_KEY' in content:
-            logger.info("Admin auth already fixed")
-            return True
-        
-        # Add admin auth dependency after the imports
-        admin_auth_code = '''
+# Helper code is inserted just before the module-level assignment to this name in main.py
+INSERT_TARGET = 'manager'
+
+ADMIN_AUTH_CODE = '''
 # Admin authentication
 def verify_admin_token(authorization: str = Header(None)):
     """Verify admin API key"""
@@ -294,81 +421,21 @@ def verify_admin_token(authorization: str = Header(None)):
     return True
 
 '''
-        
-        # Find a good place to insert (after the imports)
-        insert_marker = "manager = ConnectionManager()"
-        if insert_marker in content:
-            content = content.replace(insert_marker, admin_auth_code + insert_marker)
-        
-        # Update admin endpoints to require auth
-        old_admin_endpoint = '''@app.get("/admin/vms/status")
-async def get_all_vm_status():'''
-        
-        new_admin_endpoint = '''@app.get("/admin/vms/status")
-async def get_all_vm_status(authorized: bool = Depends(verify_admin_token)):'''
-        
-        content = content.replace(old_admin_endpoint, new_admin_endpoint)
-        
-        # Also update token overview endpoint
-        old_token_endpoint = '''@app.get("/admin/tokens/overview")
-async def get_token_overview():'''
-        
-        new_token_endpoint = '''@app.get("/admin/tokens/overview")
-async def get_token_overview(authorized: bool = Depends(verify_admin_token)):'''
-        
-        content = content.replace(old_token_endpoint, new_token_endpoint)
-        
-        # Add Header to FastAPI imports
-        content = content.replace(
-            'from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request',
-            'from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request, Header, Depends'
-        )
-        
-        with open(main_file, 'w') as f:
-            f.write(content)
-        logger.info("Admin endpoint authentication fixed")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error fixing admin auth: {e}")
-        return False
+ADMIN_ENDPOINTS = (
+    ('@app.get("/admin/vms/status")', 'async def get_all_vm_status('),
+    ('@app.get("/admin/tokens/overview")', 'async def get_token_overview('),
+)
+ADMIN_AUTH_PARAM = 'authorized: bool = Depends(verify_admin_token)'
+FASTAPI_IMPORT = 'from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request'
+FASTAPI_IMPORT_FIXED = FASTAPI_IMPORT + ', Header, Depends'
 
-def attempt_fix_error_messages():
-    """Fix error messages to not leak internal info"""
-    logger.info("Attempting to fix error message handling...")
-    
-    main_file = PLATFORM_DIR / 'api-gateway' / 'main.py'
-    
-    try:
-        with open(main_file, 'r') as f:
-            content = f.read()
-        
-        # Check if already fixed
-        if 'logger.exception' in content:
-            logger.info("Error messages already fixed")
-            return True
-        
-        # Add logging import at the top
-        if 'import logging' not in content:
-            content = 'import logging\n' + content
-        
-        # Add logger setup after imports
-        logger_setup = '''# Setup logging
+LOGGER_SETUP = '''# Setup logging
 logger = logging.getLogger(__name__)
 
 '''
-        
-        # Find a good place for logger setup
-        if 'logger = logging.getLogger' not in content:
-            insert_marker = "manager = ConnectionManager()"
-            if insert_marker in content:
-                content = content.replace(insert_marker, logger_setup + insert_marker)
-        
-        # Replace generic exception handlers
-        old_pattern = '''    except Exception as e:
+LEAKY_HANDLER = '''    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))'''
-        
-        new_pattern = '''    except HTTPException:
+SAFE_HANDLER = '''    except HTTPException:
         raise
     except ValueError as e:
         # User error - safe to show
@@ -377,17 +444,165 @@ logger = logging.getLogger(__name__)
         # System error - log internally, generic message externally
         logger.exception(f"Internal error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")'''
-        
-        content = content.replace(old_pattern, new_pattern)
-        
-        with open(main_file, 'w') as f:
-            f.write(content)
-        logger.info("Error message handling fixed")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error fixing error messages: {e}")
-        return False
+
+def fix_cors(content):
+    """Fix CORS configuration to restrict origins; returns (content, ok)"""
+    logger.info("Attempting to fix CORS configuration...")
+    
+    # Check if already fixed
+    if 'https://app.mouseplatform.com' in content:
+        logger.info("CORS already fixed")
+        return content, True
+    
+    # Locate the add_middleware(...) call that allows every origin and rewrite its arguments
+    idx = content.find(CORS_ANCHOR)
+    start = content.rfind(CORS_CALL, 0, idx) if idx >= 0 else -1
+    end = _paren_end(content, start + len(CORS_CALL) - 1) if start >= 0 else -1
+    if end < 0:
+        logger.warning("Could not find CORS configuration to fix")
+        return content, False
+    
+    call = content[start:end]
+    for old, new in CORS_REPLACEMENTS:
+        call = call.replace(old, new)
+    
+    logger.info("CORS configuration fixed")
+    return content[:start] + call + content[end:], True
+
+def fix_input_validation(content):
+    """Add input validation to CustomerCreate model; returns (content, ok)"""
+    logger.info("Attempting to fix input validation...")
+    
+    # Check if already fixed
+    if 'Field(..., min_length' in content:
+        logger.info("Input validation already fixed")
+        return content, True
+    
+    # Add Field import and replace the CustomerCreate model body (up to the next blank line)
+    start = content.find(CUSTOMER_MODEL_ANCHOR)
+    end = content.find('\n\n', start)
+    if start < 0 or end < 0 or PYDANTIC_IMPORT not in content:
+        logger.warning("Could not find CustomerCreate model to fix")
+        return content, False
+    
+    content = content[:start] + CUSTOMER_MODEL_FIXED + content[end:]
+    content = content.replace(PYDANTIC_IMPORT, PYDANTIC_IMPORT_FIXED, 1)
+    
+    logger.info("Input validation fixed")
+    return content, True
+
+def fix_admin_auth(content):
+    """Add authentication requirement to admin endpoints; returns (content, ok)"""
+    logger.info("Attempting to fix admin endpoint authentication...")
+    
+    # Check if already fixed
+    if 'ADMIN_API_KEY' in content:
+        logger.info("Admin auth already fixed")
+        return content, True
+    
+    # Add admin auth dependency after the imports
+    content, ok = _insert_before_target(content, ADMIN_AUTH_CODE)
+    if not ok:
+        logger.warning(f"Could not find the {INSERT_TARGET} assignment to insert admin auth before")
+        return content, False
+    
+    # Update admin endpoints to require auth (keeps any parameters they already take)
+    for anchor, func_prefix in ADMIN_ENDPOINTS:
+        content, ok = _add_param(content, anchor, func_prefix, ADMIN_AUTH_PARAM)
+        if not ok:
+            logger.warning(f"Could not find {anchor} to protect")
+    
+    # Add Header to FastAPI imports
+    content = content.replace(FASTAPI_IMPORT, FASTAPI_IMPORT_FIXED)
+    
+    logger.info("Admin endpoint authentication fixed")
+    return content, True
+
+def fix_error_messages(content):
+    """Fix error messages to not leak internal info; returns (content, ok)"""
+    logger.info("Attempting to fix error message handling...")
+    
+    # Check if already fixed
+    if 'logger.exception' in content:
+        logger.info("Error messages already fixed")
+        return content, True
+    
+    # Add logging import at the top
+    if 'import logging' not in content:
+        content = 'import logging\n' + content
+    
+    # Find a good place for logger setup
+    if 'logger = logging.getLogger' not in content:
+        content, ok = _insert_before_target(content, LOGGER_SETUP)
+        if not ok:
+            logger.warning(f"Could not find the {INSERT_TARGET} assignment to insert logger setup before")
+    
+    # Replace generic exception handlers
+    content = content.replace(LEAKY_HANDLER, SAFE_HANDLER)
+    
+    logger.info("Error message handling fixed")
+    return content, True
+
+# Bug ID -> transform that fixes it in the bug's fix_file
+FIXERS = {
+    'cors_restricted_in_production': fix_cors,
+    'customer_create_input_validation': fix_input_validation,
+    'api_key_header_required': fix_admin_auth,
+    'error_messages_leak_info': fix_error_messages,
+}
+
+def load_fix_state():
+    """Load the record of fixes already applied to each file"""
+    try:
+        return json_loads(FIX_STATE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def save_fix_state(state):
+    """Save the record of fixes already applied to each file"""
+    try:
+        FIX_STATE_FILE.write_text(json_dumps(state, indent=True), encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"Could not save fix state: {e}")
+
+def _apply_fixes(path, bugs, state):
+    """Apply the fixers for bugs to one file, writing it at most once; returns the fixed bugs"""
+    # Read the file once, apply every fix in memory, write it back once
+    try:
+        original = content = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        logger.error(f"Error reading {path}: {e}")
+        return []
+    
+    # Fixes recorded against this exact file content are known to be in place
+    key = str(path.relative_to(PLATFORM_DIR))
+    record = state.get(key, {})
+    digest = hashlib.sha256(original.encode('utf-8')).hexdigest()
+    applied = set(record.get('applied', ())) if record.get('sha256') == digest else set()
+    
+    fixed_bugs = []
+    for bug in bugs:
+        if bug['id'] in applied:
+            fixed_bugs.append(bug)
+            continue
+        content, ok = FIXERS[bug['id']](content)
+        if ok:
+            fixed_bugs.append(bug)
+    
+    if content != original:
+        # Write beside the target and rename over it, so it is never half-written
+        tmp_file = path.with_suffix(path.suffix + '.tmp')
+        try:
+            tmp_file.write_text(content, encoding='utf-8')
+            os.replace(tmp_file, path)
+        except OSError as e:
+            logger.error(f"Error writing {path}: {e}")
+            tmp_file.unlink(missing_ok=True)
+            return []
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    state[key] = {'sha256': digest, 'applied': sorted(applied.union(bug['id'] for bug in fixed_bugs))}
+    return fixed_bugs
 
 def attempt_fixes(bugs):
     """Attempt to automatically fix identified bugs"""
@@ -396,106 +611,127 @@ def attempt_fixes(bugs):
     fixes_attempted = []
     fixes_successful = []
     
+    # Group fixable bugs by the file they patch
+    by_file = {}
     for bug in bugs:
-        bug_id = bug['id']
-        
-        if bug_id == 'cors_restricted_in_production':
-            fixes_attempted.append(bug_id)
-            if attempt_fix_cors():
-                fixes_successful.append(bug_id)
-                bug['status'] = 'fixed'
-                
-        elif bug_id == 'customer_create_input_validation':
-            fixes_attempted.append(bug_id)
-            if attempt_fix_input_validation():
-                fixes_successful.append(bug_id)
-                bug['status'] = 'fixed'
-                
-        elif bug_id == 'api_key_header_required':
-            fixes_attempted.append(bug_id)
-            if attempt_fix_admin_auth():
-                fixes_successful.append(bug_id)
-                bug['status'] = 'fixed'
-                
-        elif bug_id == 'error_messages_leak_info':
-            fixes_attempted.append(bug_id)
-            if attempt_fix_error_messages():
-                fixes_successful.append(bug_id)
-                bug['status'] = 'fixed'
+        if bug['id'] in FIXERS:
+            fixes_attempted.append(bug['id'])
+            by_file.setdefault(bug['fix_file'], []).append(bug)
+    
+    state = load_fix_state()
+    for fix_file, file_bugs in by_file.items():
+        for bug in _apply_fixes(PLATFORM_DIR / fix_file, file_bugs, state):
+            fixes_successful.append(bug['id'])
+            bug['status'] = 'fixed'
+    if by_file:
+        save_fix_state(state)
     
     logger.info(f"Fixes attempted: {len(fixes_attempted)}, successful: {len(fixes_successful)}")
     return fixes_attempted, fixes_successful
 
-def generate_report(results, bugs_data, fixes_attempted, fixes_successful):
-    """Generate a summary report"""
-    report = []
-    report.append("=" * 70)
-    report.append("CONTINUOUS TESTING REPORT")
-    report.append("=" * 70)
-    report.append(f"Timestamp: {datetime.now(timezone.utc).isoformat()}")
-    report.append("")
-    
-    # Test results
-    report.append("TEST RESULTS:")
-    report.append(f"  Passed: {results.get('passed', 0)}")
-    report.append(f"  Failed: {results.get('failed', 0)}")
-    report.append(f"  Errors: {results.get('errors', 0)}")
-    report.append("")
+def generate_report(out, now, results, bugs_data, fixes_attempted, fixes_successful):
+    """Write a summary report for the cycle started at now to the file-like object out"""
+    w = out.write
+    w("=" * 70 + "\n")
+    w("CONTINUOUS TESTING REPORT\n")
+    w("=" * 70 + "\n")
+    w(f"Timestamp: {now.isoformat()}\n")
     
     # Bugs found
     open_bugs = [b for b in bugs_data['bugs'] if b['status'] == 'open']
-    fixed_bugs = [b for b in bugs_data['bugs'] if b['status'] == 'fixed']
     
-    report.append("BUGS STATUS:")
-    report.append(f"  Open: {len(open_bugs)}")
-    report.append(f"  Fixed: {len(fixed_bugs)}")
-    report.append(f"  Total Found (all time): {bugs_data['total_found']}")
-    report.append("")
+    # Green run with nothing outstanding: one line is enough
+    if results.get('return_code') == 0 and not open_bugs and not fixes_attempted:
+        w(f"ALL GREEN: {results.get('passed', 0)} passed\n")
+        w("=" * 70)
+        return
+    w("\n")
+    
+    # Test results
+    w("TEST RESULTS:\n")
+    w(f"  Passed: {results.get('passed', 0)}\n")
+    w(f"  Failed: {results.get('failed', 0)}\n")
+    w(f"  Errors: {results.get('errors', 0)}\n")
+    if results.get('rerun'):
+        w(f"  Re-run after fixes: {results['rerun']} (others from the full run)\n")
+    w("\n")
+    
+    fixed_count = sum(1 for b in bugs_data['bugs'] if b['status'] == 'fixed')
+    
+    w("BUGS STATUS:\n")
+    w(f"  Open: {len(open_bugs)}\n")
+    w(f"  Fixed: {fixed_count}\n")
+    w(f"  Total Found (all time): {bugs_data['total_found']}\n")
+    w("\n")
     
     if open_bugs:
-        report.append("OPEN BUGS:")
+        w("OPEN BUGS:\n")
         for bug in open_bugs:
-            report.append(f"  [{bug['severity']}] {bug['description']}")
-            report.append(f"    File: {bug['fix_file']}")
-        report.append("")
+            w(f"  [{bug['severity']}] {bug['description']}\n")
+            w(f"    File: {bug['fix_file']}\n")
+        w("\n")
     
     if fixes_attempted:
-        report.append("AUTOMATIC FIXES:")
-        report.append(f"  Attempted: {len(fixes_attempted)}")
-        report.append(f"  Successful: {len(fixes_successful)}")
-        report.append("")
+        w("AUTOMATIC FIXES:\n")
+        w(f"  Attempted: {len(fixes_attempted)}\n")
+        w(f"  Successful: {len(fixes_successful)}\n")
+        w("\n")
     
-    report.append("=" * 70)
-    
-    return "\n".join(report)
+    w("=" * 70)
+
+def prune_files(directory, pattern):
+    """Delete all but the newest MAX_REPORT_FILES files matching pattern in directory"""
+    files = sorted(directory.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old_file in files[MAX_REPORT_FILES:]:
+        try:
+            old_file.unlink()
+        except OSError as e:
+            logger.warning(f"Could not remove old file {old_file}: {e}")
+
+def rotate_reports():
+    """Delete all but the newest MAX_REPORT_FILES report files"""
+    prune_files(PLATFORM_DIR, 'report_*.txt')
+
+_stop = threading.Event()
+
+def _handle_sigterm(signum, frame):
+    """Stop the loop after the current step instead of dying mid-write"""
+    logger.info("Received SIGTERM, stopping after the current step")
+    _stop.set()
 
 def main():
     """Main continuous testing loop"""
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     logger.info("Starting Continuous Testing System")
     logger.info(f"Test interval: {TEST_INTERVAL_MINUTES} minutes")
     logger.info(f"Platform directory: {PLATFORM_DIR}")
     
     # Load existing data
     bugs_data = load_bugs()
-    results_data = load_results()
+    recent_runs = load_results()
     
     run_count = 0
+    verify_count = 0
     
-    while True:
+    while not _stop.is_set():
+        # Runs start on a fixed cadence, however long the previous one took
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)  # one timestamp for every record of this cycle
         run_count += 1
         logger.info(f"\n{'='*60}")
         logger.info(f"TEST RUN #{run_count}")
         logger.info(f"{'='*60}")
         
         # Run tests
-        results = run_tests()
-        results_data['runs'].append(results)
-        save_results(results_data)
+        results = run_tests(now)
+        append_result(recent_runs, results)
         
-        # Analyze failures
-        if results.get('failed', 0) > 0 or results.get('errors', 0) > 0:
+        # Analyze failures; a green run skips analysis and fixing entirely
+        fixes_attempted = []
+        fixes_successful = []
+        if results.get('failed', 0) + results.get('errors', 0) > 0:
             logger.info("Analyzing failures...")
-            new_bugs = analyze_failures(results.get('output', ''))
+            new_bugs = analyze_failures(results.get('failed_tests', []), now.isoformat())
             
             for bug in new_bugs:
                 # Check if bug already exists
@@ -514,28 +750,39 @@ def main():
             if fixes_successful:
                 save_bugs(bugs_data)
                 
-                # Re-run tests to verify fixes
+                # Re-run the failed tests to verify fixes, or everything if the fix was broad
+                verify_count += 1
+                full = verify_count % FULL_VERIFY_EVERY == 0 or not BROAD_FIXES.isdisjoint(fixes_successful)
                 logger.info("Re-running tests to verify fixes...")
-                results = run_tests()
-                results_data['runs'].append(results)
-                save_results(results_data)
-        else:
+                verify = run_tests(now, None if full else results.get('failed_tests'), name='verify')
+                results = verify if full else merge_verify_results(results, verify)
+                append_result(recent_runs, results)
+        elif results.get('return_code') == 0:
             logger.info("All tests passed! No bugs found.")
-            fixes_attempted = []
-            fixes_successful = []
+        else:
+            logger.warning(f"Test run did not complete: {results.get('error', 'no test report')}")
         
         # Generate and log report
-        report = generate_report(results, bugs_data, fixes_attempted, fixes_successful)
-        logger.info("\n" + report)
+        report = io.StringIO()
+        generate_report(report, now, results, bugs_data, fixes_attempted, fixes_successful)
+        logger.info("\n" + report.getvalue())
         
-        # Save report to file
-        report_file = PLATFORM_DIR / f'report_{datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")}.txt'
-        with open(report_file, 'w') as f:
-            f.write(report)
+        # Save report to file, keeping only the most recent ones
+        report_file = PLATFORM_DIR / f'report_{now:%Y%m%d_%H%M%S}.txt'
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        rotate_reports()
         
         # Wait for next run
-        logger.info(f"\nWaiting {TEST_INTERVAL_MINUTES} minutes until next test run...")
-        time.sleep(TEST_INTERVAL_MINUTES * 60)
+        remaining = TEST_INTERVAL_MINUTES * 60 - (time.monotonic() - started)
+        if remaining > 0:
+            logger.info(f"\nWaiting {remaining / 60:.1f} minutes until next test run...")
+            _stop.wait(remaining)
+        else:
+            logger.warning(f"Test run took longer than {TEST_INTERVAL_MINUTES} minutes, starting next run now")
+    
+    _reset_executor()
+    logger.info("Continuous testing stopped")
 
 if __name__ == '__main__':
     try:
@@ -4,15 +4,30 @@ Example usage of the Prospect Research Engine
 This script demonstrates how to use the deep research personalization system
 to research prospects and generate personalized outreach.
 """
+import os
 import asyncio
 import json
 from prospect_research import ProspectResearchEngine
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib json module
+
+# Research files are written compact; set DEBUG_PRETTY=1 to indent them
+PRETTY_JSON = os.getenv("DEBUG_PRETTY") == "1"
+
+SEVERITY_EMOJI = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+IMPACT_EMOJI = {"high": "🚀", "medium": "⚡", "low": "💡"}
+
+RULE = "=" * 60
+THIN_RULE = "-" * 60
+
 async def demo_single_company():
     """Demo: Research a single company"""
-    print("=" * 60)
+    print(RULE)
     print("DEEP RESEARCH PERSONALIZATION DEMO")
-    print("=" * 60)
+    print(RULE)
     
     # Initialize the research engine
     engine = ProspectResearchEngine()
@@ -22,66 +37,69 @@ async def demo_single_company():
     company_name = "Stripe"
     
     print(f"\n🔍 Researching: {company_name} ({domain})")
-    print("-" * 60)
+    print(THIN_RULE)
     
     result = await engine.research_company(domain, company_name)
     
-    # Print results
-    print(f"\n📊 COMPANY OVERVIEW")
-    print(f"   Name: {result.company_name}")
-    print(f"   Industry: {result.industry}")
-    print(f"   Sub-industry: {result.sub_industry}")
-    print(f"   Employees: {result.employee_count}")
-    print(f"   Revenue: {result.revenue_range}")
-    print(f"   Location: {result.location}")
-    
-    print(f"\n🌐 WEBSITE ANALYSIS")
-    print(f"   Summary: {result.website_summary}")
-    print(f"   Products/Services: {', '.join(result.products_services)}")
-    print(f"   Value Prop: {result.value_proposition}")
-    
-    print(f"\n💼 LINKEDIN PRESENCE")
-    print(f"   URL: {result.linkedin_url}")
-    print(f"   Followers: {result.linkedin_followers:,}")
-    print(f"   Recent Posts: {len(result.linkedin_posts)}")
-    print(f"   Culture: {result.company_culture}")
-    
-    print(f"\n📰 RECENT NEWS")
+    # Build the whole report, then write it to stdout in one go
+    out = [
+        f"\n📊 COMPANY OVERVIEW",
+        f"   Name: {result.company_name}",
+        f"   Industry: {result.industry}",
+        f"   Sub-industry: {result.sub_industry}",
+        f"   Employees: {result.employee_count}",
+        f"   Revenue: {result.revenue_range}",
+        f"   Location: {result.location}",
+        f"\n🌐 WEBSITE ANALYSIS",
+        f"   Summary: {result.website_summary}",
+        f"   Products/Services: {', '.join(result.products_services)}",
+        f"   Value Prop: {result.value_proposition}",
+        f"\n💼 LINKEDIN PRESENCE",
+        f"   URL: {result.linkedin_url}",
+        f"   Followers: {result.linkedin_followers:,}",
+        f"   Recent Posts: {len(result.linkedin_posts)}",
+        f"   Culture: {result.company_culture}",
+        f"\n📰 RECENT NEWS",
+    ]
     for news in result.recent_news[:3]:
-        print(f"   • {news['title']}")
+        out.append(f"   • {news['title']}")
     
-    print(f"\n🎯 PAIN POINTS IDENTIFIED")
+    out.append(f"\n🎯 PAIN POINTS IDENTIFIED")
+    severity_emoji_for = SEVERITY_EMOJI.get
     for pain_point in result.identified_pain_points:
-        severity_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(pain_point['severity'], "⚪")
-        print(f"   {severity_emoji} [{pain_point['category'].upper()}] {pain_point['description']}")
-        print(f"      Evidence: {pain_point['evidence']}")
+        severity_emoji = severity_emoji_for(pain_point['severity'], "⚪")
+        out.append(f"   {severity_emoji} [{pain_point['category'].upper()}] {pain_point['description']}")
+        out.append(f"      Evidence: {pain_point['evidence']}")
     
-    print(f"\n🤖 RECOMMENDED AI EMPLOYEES")
+    out.append(f"\n🤖 RECOMMENDED AI EMPLOYEES")
+    impact_emoji_for = IMPACT_EMOJI.get
     for employee in result.recommended_employees:
-        impact_emoji = {"high": "🚀", "medium": "⚡", "low": "💡"}.get(employee['estimated_impact'], "•")
-        print(f"   {impact_emoji} {employee['role']}")
-        print(f"      Why: {employee['reason']}")
-        print(f"      Value: ${employee['hourly_value']}/hour")
-    
-    print(f"\n📧 GENERATED EMAIL")
-    print(f"   Subject: {result.email_subject}")
-    print(f"\n   Body:")
-    print(f"   {'-' * 50}")
-    print(result.personalized_email)
-    print(f"   {'-' * 50}")
-    
-    print(f"\n✅ Confidence Score: {result.confidence_score * 100:.0f}%")
-    print(f"📊 Data Sources: {', '.join(result.data_sources)}")
-    print(f"🕐 Research Date: {result.research_date}")
+        impact_emoji = impact_emoji_for(employee['estimated_impact'], "•")
+        out.append(f"   {impact_emoji} {employee['role']}")
+        out.append(f"      Why: {employee['reason']}")
+        out.append(f"      Value: ${employee['hourly_value']}/hour")
+    
+    out += (
+        f"\n📧 GENERATED EMAIL",
+        f"   Subject: {result.email_subject}",
+        f"\n   Body:",
+        f"   {'-' * 50}",
+        f"{result.personalized_email}",
+        f"   {'-' * 50}",
+        f"\n✅ Confidence Score: {result.confidence_score * 100:.0f}%",
+        f"📊 Data Sources: {', '.join(result.data_sources)}",
+        f"🕐 Research Date: {result.research_date}",
+    )
+    print("\n".join(out))
     
     return result
 
 
 async def demo_batch_research():
     """Demo: Research multiple companies"""
-    print("\n" + "=" * 60)
+    print("\n" + RULE)
     print("BATCH RESEARCH DEMO")
-    print("=" * 60)
+    print(RULE)
     
     engine = ProspectResearchEngine()
     
@@ -93,12 +111,13 @@ async def demo_batch_research():
     
     print(f"\n🔍 Researching {len(domains)} companies...")
     
-    results = await engine.batch_research(domains)
-    
     print(f"\n📊 BATCH RESULTS SUMMARY")
-    print("-" * 60)
+    print(THIN_RULE)
     
-    for result in results:
+    # Each company is printed as soon as its research finishes
+    results = []
+    async for result in engine.research_as_completed(domains):
+        results.append(result)
         print(f"\n   {result.company_name}")
         print(f"   ├── Industry: {result.industry}")
         print(f"   ├── Pain Points: {len(result.identified_pain_points)}")
@@ -110,9 +129,9 @@ async def demo_batch_research():
 
 async def demo_enrich_only():
     """Demo: Quick enrichment from Apollo only"""
-    print("\n" + "=" * 60)
+    print("\n" + RULE)
     print("APOLLO ENRICHMENT DEMO")
-    print("=" * 60)
+    print(RULE)
     
     engine = ProspectResearchEngine()
     
@@ -137,10 +156,19 @@ async def demo_enrich_only():
     print(f"   Description: {research.description[:100]}..." if research.description else "   Description: N/A")
 
 
-def save_research_to_json(research, filename: str = "research_result.json"):
-    """Save research results to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(research.to_dict(), f, indent=2, default=str)
+def save_research_to_json(research, filename: str = "research_result.json", data: dict = None):
+    """Save research results to JSON file, using orjson when available
+    
+    Pass data to reuse an existing research.to_dict() instead of walking the dataclass again.
+    """
+    if data is None:
+        data = research.to_dict()
+    if orjson:
+        encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2 if PRETTY_JSON else 0, default=str)
+    else:
+        encoded = json.dumps(data, indent=2 if PRETTY_JSON else None, default=str).encode()
+    with open(filename, 'wb') as f:
+        f.write(encoded)
     print(f"\n💾 Research saved to: {filename}")
 
 
@@ -158,9 +186,9 @@ async def main():
     # Demo 3: Apollo enrichment only (commented out)
     # await demo_enrich_only()
     
-    print("\n" + "=" * 60)
+    print("\n" + RULE)
     print("DEMO COMPLETE")
-    print("=" * 60)
+    print(RULE)
     print("\n✅ The deep research system can now:")
     print("   • Research company websites and extract key information")
     print("   • Analyze LinkedIn presence and company culture")
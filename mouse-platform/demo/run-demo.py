@@ -12,71 +12,82 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from orchestrator import MousePlatform
 
-async def run_demo():
-    print("""
+BANNER = """
 ╔════════════════════════════════════════════════════════════════╗
 ║                   🎯 MOUSE PLATFORM DEMO                        ║
 ║                   Clean Eats - AI Workforce                     ║
 ╚════════════════════════════════════════════════════════════════╝
-    """)
+    """
+HEAVY_RULE = "═" * 60
+LIGHT_RULE = "─" * 60
+
+async def run_demo():
+    print(BANNER)
     
     platform = MousePlatform()
     
     print("🚀 Starting demo...\n")
     
-    # Run the demo
+    # Run the demo; everything is printed after the last await
     result = await platform.run_demo()
     
+    return render_demo(result)
+
+def render_demo(result):
+    """Print the demo summary once every request has finished; returns the exit code"""
     if result["success"]:
-        print("✅ DEMO SETUP COMPLETE!\n")
-        print("═" * 60)
-        print("📊 CUSTOMER")
-        print("═" * 60)
-        print(f"   Company: {result['customer']['company_name']}")
-        print(f"   Email:   {result['customer']['email']}")
-        print(f"   Plan:    {result['customer']['plan_tier'].title()}")
-        print(f"   ID:      {result['customer']['id']}")
-        
-        print("\n🤖 KING MOUSE (Customer Interface)")
-        print("─" * 60)
-        print(f"   Bot:     @{result['king_mouse']['bot_username']}")
-        print(f"   Link:    {result['king_mouse']['bot_link']}")
-        print(f"   Status:  {result['king_mouse']['status']}")
-        
-        print("\n👥 AI EMPLOYEES DEPLOYED")
-        print("─" * 60)
+        # Build the whole summary, then write it to stdout in one go
+        customer = result["customer"]
+        king_mouse = result["king_mouse"]
+        out = [
+            "✅ DEMO SETUP COMPLETE!\n",
+            HEAVY_RULE,
+            "📊 CUSTOMER",
+            HEAVY_RULE,
+            f"   Company: {customer['company_name']}",
+            f"   Email:   {customer['email']}",
+            f"   Plan:    {customer['plan_tier'].title()}",
+            f"   ID:      {customer['id']}",
+            "\n🤖 KING MOUSE (Customer Interface)",
+            LIGHT_RULE,
+            f"   Bot:     @{king_mouse['bot_username']}",
+            f"   Link:    {king_mouse['bot_link']}",
+            f"   Status:  {king_mouse['status']}",
+            "\n👥 AI EMPLOYEES DEPLOYED",
+            LIGHT_RULE,
+        ]
         for emp in result["employees"]:
-            print(f"\n   🎭 {emp['name']}")
-            print(f"      Role: {emp['role']}")
-            print(f"      ID:   {emp['id']}")
-            print(f"      VM:   {emp['vm_url']}")
-        
-        print("\n🌐 DASHBOARD")
-        print("─" * 60)
-        print(f"   http://localhost:3000{result['dashboard_url']}")
-        
-        print("\n📱 TELEGRAM QR CODE")
-        print("─" * 60)
-        print(f"   Save this QR code to scan:")
-        print(f"   {result['qr_code_url'][:80]}...")
-        
-        print("\n" + "═" * 60)
-        print("💬 TRY THESE MESSAGES IN TELEGRAM:")
-        print("═" * 60)
-        print('   "I need a website for my meal prep business"')
-        print('   "Create Instagram posts for our launch"')
-        print('   "Help me get more customers"')
-        
-        print("\n" + "═" * 60)
-        print("🎥 LIVE VM MONITORING")
-        print("═" * 60)
-        print("   Screenshots update every 3 seconds")
-        print("   Watch your AI employees work in real-time!")
-        
-        print("\n" + "═" * 60)
-        print("🧹 CLEANUP")
-        print("═" * 60)
-        print("   python3 demo/cleanup-demo.py")
+            out += (
+                f"\n   🎭 {emp['name']}",
+                f"      Role: {emp['role']}",
+                f"      ID:   {emp['id']}",
+                f"      VM:   {emp['vm_url']}",
+            )
+        out += (
+            "\n🌐 DASHBOARD",
+            LIGHT_RULE,
+            f"   http://localhost:3000{result['dashboard_url']}",
+            "\n📱 TELEGRAM QR CODE",
+            LIGHT_RULE,
+            "   Save this QR code to scan:",
+            f"   {result['qr_code_url'][:80]}...",
+            "\n" + HEAVY_RULE,
+            "💬 TRY THESE MESSAGES IN TELEGRAM:",
+            HEAVY_RULE,
+            '   "I need a website for my meal prep business"',
+            '   "Create Instagram posts for our launch"',
+            '   "Help me get more customers"',
+            "\n" + HEAVY_RULE,
+            "🎥 LIVE VM MONITORING",
+            HEAVY_RULE,
+            "   Screenshots update every 3 seconds",
+            "   Watch your AI employees work in real-time!",
+            "\n" + HEAVY_RULE,
+            "🧹 CLEANUP",
+            HEAVY_RULE,
+            "   python3 demo/cleanup-demo.py",
+        )
+        print("\n".join(out))
         
     else:
         print("❌ Demo failed!")
@@ -6,15 +6,30 @@ Simulates the real API with intentional bugs to test the stress test framework
 
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-import uuid
+from typing import Optional, Dict, Awaitable, Callable
+import os
+import re
+import json
 import random
 import asyncio
 import time
+from collections import defaultdict, deque
+from secrets import token_hex
+from dataclasses import dataclass
 from datetime import datetime
 
-app = FastAPI(title="Mouse Platform API (Mock)")
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib json module
+
+app = FastAPI(
+    title="Mouse Platform API (Mock)",
+    default_response_class=ORJSONResponse if orjson else JSONResponse,
+)
 
 # Add CORS middleware - intentionally wide open (BUG: HIGH-1)
 app.add_middleware(
@@ -25,17 +40,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON bodies such as long VM listings; small ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# Simulated latency; set MOCK_SIMULATE_LATENCY=0 to benchmark the server itself.
+# On by default: the deploy delay is what lets concurrent deploys slip past the VM limit check.
+SIMULATE_LATENCY = os.getenv("MOCK_SIMULATE_LATENCY", "1") == "1"
+VM_STREAM_INTERVAL = float(os.getenv("MOCK_VM_STREAM_INTERVAL", "1"))  # seconds between frames
+
 # In-memory storage
 customers: Dict[str, dict] = {}
-vms: Dict[str, dict] = {}
-employees: Dict[str, dict] = {}
-chat_logs: List[dict] = []
+customer_ids_by_email: Dict[str, str] = {}  # email -> customer ID, for the duplicate check
+vms: Dict[str, "VM"] = {}
+vms_by_customer: Dict[str, Dict[str, "VM"]] = defaultdict(dict)  # customer ID -> {VM ID: VM}
+employees: Dict[str, "Employee"] = {}
+king_mouse_bots: Dict[str, tuple] = {}  # customer ID -> (bot username, bot link), set at signup
+MAX_CHAT_LOGS = 10_000  # oldest messages are dropped so long stress runs don't grow memory
+chat_logs: deque = deque(maxlen=MAX_CHAT_LOGS)
 token_packages = [
     {"id": "pkg_starter", "name": "Starter", "price": 19, "tokens": 2000},
     {"id": "pkg_growth", "name": "Growth", "price": 49, "tokens": 6000},
     {"id": "pkg_pro", "name": "Pro", "price": 99, "tokens": 15000}
 ]
 
+def _encode_json(content) -> bytes:
+    """Encode a response body the same way the default response class does"""
+    if orjson:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+# The package list never changes at runtime, so its body is encoded once at import
+_TOKEN_PACKAGES_JSON = _encode_json(token_packages)
+
+# Fake screenshot (1x1 pixel PNG) served by the screenshot endpoint and VM stream
+FAKE_SCREENSHOT = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9aw=="
+# VM stream frames are this prefix + timestamp + '"}', the same JSON send_json would produce
+SCREENSHOT_FRAME_PREFIX = '{"type":"screenshot","data":"' + FAKE_SCREENSHOT + '","timestamp":"'
+FAKE_QR_CODE_URL = "data:image/png;base64," + FAKE_SCREENSHOT
+
+# King Mouse keyword intents, checked in order; each keyword list is compiled into
+# one pattern so a message is scanned once per intent instead of once per keyword
+MESSAGE_INTENTS = [
+    (re.compile("|".join(map(re.escape, keywords))), response)
+    for keywords, response in (
+        (("website", "web", "site", "landing page"),
+         "I'll deploy a web developer for you right away! They'll start building your website."),
+        (("social media", "instagram", "facebook", "marketing"),
+         "I'll deploy a social media manager to handle your marketing!"),
+        (("sales", "leads", "prospecting"),
+         "I'll deploy a sales rep to find new leads for your business!"),
+        (("bookkeeping", "accounting", "books"),
+         "I'll deploy a bookkeeper to organize your finances!"),
+    )
+]
+
 # Request models
 class CustomerCreate(BaseModel):
     company_name: str
@@ -52,25 +110,59 @@ class VMDeployRequest(BaseModel):
     name: str
     task_description: str
 
+# Stored records; slotted dataclasses are smaller and quicker to build than dicts
+@dataclass(slots=True)
+class Employee:
+    id: str
+    customer_id: str
+    name: str
+    role: str
+    status: str
+    vm_id: str
+    current_task: str
+    created_at: str
+    started_at: str
+
+@dataclass(slots=True)
+class VM:
+    id: str
+    employee_id: str
+    customer_id: str
+    url: str
+    status: str = "running"
+    ram: int = 4  # GB
+    cpu: int = 2  # cores
+    os: str = "linux"
+
 # ======== API ENDPOINTS ========
 
+# Health probes arrive continuously, so the body is rebuilt at most once per HEALTH_CACHE_TTL
+HEALTH_CACHE_TTL = 1.0  # seconds; the reported timestamp is at most this stale
+_health_body = b""
+_health_built_at: Optional[float] = None
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {
-            "supabase": True,
-            "orgo": True,
-            "telegram": True
-        }
-    }
+    global _health_body, _health_built_at
+    now = time.monotonic()
+    if _health_built_at is None or now - _health_built_at >= HEALTH_CACHE_TTL:
+        _health_body = _encode_json({
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "services": {
+                "supabase": True,
+                "orgo": True,
+                "telegram": True
+            }
+        })
+        _health_built_at = now
+    return Response(content=_health_body, media_type="application/json")
 
 @app.get("/api/v1/token-packages")
 async def get_token_packages():
     """Get available token packages"""
-    return token_packages
+    return Response(content=_TOKEN_PACKAGES_JSON, media_type="application/json")
 
 @app.post("/api/v1/customers")
 async def create_customer(customer: CustomerCreate):
@@ -80,11 +172,10 @@ async def create_customer(customer: CustomerCreate):
     # Allowing very long strings without validation
     
     # Check for duplicate email
-    for c in customers.values():
-        if c["email"] == customer.email:
-            raise HTTPException(status_code=409, detail="Email already registered")
+    if customer.email in customer_ids_by_email:
+        raise HTTPException(status_code=409, detail="Email already registered")
     
-    customer_id = f"cst_{uuid.uuid4().hex[:12]}"
+    customer_id = f"cst_{token_hex(6)}"
     
     new_customer = {
         "id": customer_id,
@@ -96,24 +187,28 @@ async def create_customer(customer: CustomerCreate):
     }
     
     customers[customer_id] = new_customer
+    customer_ids_by_email[customer.email] = customer_id
     
     # Create King Mouse bot
     bot_username = f"{customer.company_name.lower().replace(' ', '_')}_king_mouse_bot"
+    bot_link = f"https://t.me/{bot_username}"
+    king_mouse_bots[customer_id] = (bot_username, bot_link)
     king_mouse = {
-        "bot_token": f"demo_token_{uuid.uuid4().hex}",
+        "bot_token": f"demo_token_{token_hex(16)}",
         "bot_username": bot_username,
-        "bot_link": f"https://t.me/{bot_username}",
+        "bot_link": bot_link,
         "total_interactions": 0
     }
     
     # Simulate random delay (VM creation simulation)
-    await asyncio.sleep(random.uniform(0.1, 0.5))
+    if SIMULATE_LATENCY:
+        await asyncio.sleep(random.uniform(0.1, 0.5))
     
     return {
         "success": True,
         "customer": new_customer,
         "king_mouse": king_mouse,
-        "qr_code_url": f"data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9aw=="
+        "qr_code_url": FAKE_QR_CODE_URL
     }
 
 @app.get("/api/v1/customers/{customer_id}")
@@ -129,14 +224,13 @@ async def get_king_mouse_status(customer_id: str):
     if customer_id not in customers:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    customer = customers[customer_id]
-    bot_username = f"{customer['company_name'].lower().replace(' ', '_')}_king_mouse_bot"
+    bot_username, bot_link = king_mouse_bots[customer_id]
     
     return {
         "status": "active",
         "bot_username": bot_username,
-        "bot_link": f"https://t.me/{bot_username}",
-        "qr_code_url": f"data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9aw==",
+        "bot_link": bot_link,
+        "qr_code_url": FAKE_QR_CODE_URL,
         "total_interactions": random.randint(0, 100)
     }
 
@@ -147,6 +241,7 @@ async def send_message(customer_id: str, request: MessageRequest):
         raise HTTPException(status_code=404, detail="Customer not found")
     
     message = request.message.lower()
+    now_iso = datetime.utcnow().isoformat()  # shared by the chat log and employee records
     
     # Simple keyword matching (rule-based AI)
     response = "I'm here to help! What do you need?"
@@ -154,26 +249,13 @@ async def send_message(customer_id: str, request: MessageRequest):
     employee_deployed = None
     vm_id = None
     
-    if any(word in message for word in ["website", "web", "site", "landing page"]):
-        response = "I'll deploy a web developer for you right away! They'll start building your website."
-        action = "deploy_employee"
-        employee_deployed = f"emp_{uuid.uuid4().hex[:12]}"
-        vm_id = f"vm_{uuid.uuid4().hex[:12]}"
-    elif any(word in message for word in ["social media", "instagram", "facebook", "marketing"]):
-        response = "I'll deploy a social media manager to handle your marketing!"
-        action = "deploy_employee"
-        employee_deployed = f"emp_{uuid.uuid4().hex[:12]}"
-        vm_id = f"vm_{uuid.uuid4().hex[:12]}"
-    elif any(word in message for word in ["sales", "leads", "prospecting"]):
-        response = "I'll deploy a sales rep to find new leads for your business!"
-        action = "deploy_employee"
-        employee_deployed = f"emp_{uuid.uuid4().hex[:12]}"
-        vm_id = f"vm_{uuid.uuid4().hex[:12]}"
-    elif any(word in message for word in ["bookkeeping", "accounting", "books"]):
-        response = "I'll deploy a bookkeeper to organize your finances!"
-        action = "deploy_employee"
-        employee_deployed = f"emp_{uuid.uuid4().hex[:12]}"
-        vm_id = f"vm_{uuid.uuid4().hex[:12]}"
+    for pattern, intent_response in MESSAGE_INTENTS:
+        if pattern.search(message):
+            response = intent_response
+            action = "deploy_employee"
+            employee_deployed = f"emp_{token_hex(6)}"
+            vm_id = f"vm_{token_hex(6)}"
+            break
     
     # Log chat
     chat_logs.append({
@@ -181,7 +263,7 @@ async def send_message(customer_id: str, request: MessageRequest):
         "message": request.message,
         "response": response,
         "action_taken": action,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": now_iso
     })
     
     result = {
@@ -195,28 +277,24 @@ async def send_message(customer_id: str, request: MessageRequest):
         result["vm_id"] = vm_id
         
         # Store the employee and VM
-        employees[employee_deployed] = {
-            "id": employee_deployed,
-            "customer_id": customer_id,
-            "name": "Alex",
-            "role": "Web Developer" if "website" in message else "Assistant",
-            "status": "deploying",
-            "vm_id": vm_id,
-            "current_task": "Just deployed",
-            "created_at": datetime.utcnow().isoformat(),
-            "started_at": datetime.utcnow().isoformat()
-        }
+        employees[employee_deployed] = Employee(
+            id=employee_deployed,
+            customer_id=customer_id,
+            name="Alex",
+            role="Web Developer" if "website" in message else "Assistant",
+            status="deploying",
+            vm_id=vm_id,
+            current_task="Just deployed",
+            created_at=now_iso,
+            started_at=now_iso
+        )
         
-        vms[vm_id] = {
-            "id": vm_id,
-            "employee_id": employee_deployed,
-            "customer_id": customer_id,
-            "status": "running",
-            "url": f"https://vm.orgo.com/{vm_id}",
-            "ram": 4,
-            "cpu": 2,
-            "os": "linux"
-        }
+        vms[vm_id] = vms_by_customer[customer_id][vm_id] = VM(
+            id=vm_id,
+            employee_id=employee_deployed,
+            customer_id=customer_id,
+            url=f"https://vm.orgo.com/{vm_id}"
+        )
     
     return result
 
@@ -226,20 +304,19 @@ async def list_vms(customer_id: str):
     if customer_id not in customers:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    customer_vms = [
-        {
-            "id": vm["id"],
-            "employee_id": vm["employee_id"],
-            "employee_name": employees.get(vm["employee_id"], {}).get("name", "Unknown"),
-            "role": employees.get(vm["employee_id"], {}).get("role", "Unknown"),
+    customer_vms = []
+    for vm in vms_by_customer[customer_id].values():
+        employee = employees.get(vm.employee_id)
+        customer_vms.append({
+            "id": vm.id,
+            "employee_id": vm.employee_id,
+            "employee_name": employee.name if employee else "Unknown",
+            "role": employee.role if employee else "Unknown",
             "status": "active",
-            "url": vm["url"],
-            "vm_status": vm["status"],
-            "current_task": employees.get(vm["employee_id"], {}).get("current_task", "Idle")
-        }
-        for vm in vms.values()
-        if vm.get("customer_id") == customer_id
-    ]
+            "url": vm.url,
+            "vm_status": vm.status,
+            "current_task": employee.current_task if employee else "Idle"
+        })
     
     return {"vms": customer_vms}
 
@@ -252,42 +329,39 @@ async def deploy_vm(customer_id: str, request: VMDeployRequest):
     customer = customers[customer_id]
     
     # Check plan limits
-    customer_vms = [v for v in vms.values() if v.get("customer_id") == customer_id]
     plan_limits = {"starter": 2, "growth": 5, "enterprise": 20}
-    if len(customer_vms) >= plan_limits.get(customer["plan_tier"], 2):
+    if len(vms_by_customer[customer_id]) >= plan_limits.get(customer["plan_tier"], 2):
         raise HTTPException(status_code=403, detail="VM limit reached for plan")
     
-    employee_id = f"emp_{uuid.uuid4().hex[:12]}"
-    vm_id = f"vm_{uuid.uuid4().hex[:12]}"
+    employee_id = f"emp_{token_hex(6)}"
+    vm_id = f"vm_{token_hex(6)}"
     
     # Simulate deployment delay
-    await asyncio.sleep(random.uniform(0.5, 1.5))
-    
-    employee = {
-        "id": employee_id,
-        "customer_id": customer_id,
-        "name": request.name,
-        "role": request.role,
-        "status": "deploying",  # BUG: Should be "active" after deployment
-        "vm_id": vm_id,
-        "current_task": request.task_description,
-        "created_at": datetime.utcnow().isoformat(),
-        "started_at": datetime.utcnow().isoformat()
-    }
-    
-    vm = {
-        "id": vm_id,
-        "employee_id": employee_id,
-        "customer_id": customer_id,
-        "url": f"https://vm.orgo.com/{vm_id}",
-        "status": "running",
-        "ram": 4,
-        "cpu": 2,
-        "os": "linux"
-    }
+    if SIMULATE_LATENCY:
+        await asyncio.sleep(random.uniform(0.5, 1.5))
+    now_iso = datetime.utcnow().isoformat()
+    
+    employee = Employee(
+        id=employee_id,
+        customer_id=customer_id,
+        name=request.name,
+        role=request.role,
+        status="deploying",  # BUG: Should be "active" after deployment
+        vm_id=vm_id,
+        current_task=request.task_description,
+        created_at=now_iso,
+        started_at=now_iso
+    )
+    
+    vm = VM(
+        id=vm_id,
+        employee_id=employee_id,
+        customer_id=customer_id,
+        url=f"https://vm.orgo.com/{vm_id}"
+    )
     
     employees[employee_id] = employee
-    vms[vm_id] = vm
+    vms[vm_id] = vms_by_customer[customer_id][vm_id] = vm
     
     # BUG: MEDIUM-2 - Returns employee before status update
     return {
@@ -306,14 +380,22 @@ async def get_screenshot(customer_id: str, vm_id: str):
     if vm_id not in vms:
         raise HTTPException(status_code=404, detail="VM not found")
     
-    # Generate fake screenshot (1x1 pixel PNG)
-    fake_screenshot = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9aw=="
-    
     return {
-        "screenshot_base64": fake_screenshot,
+        "screenshot_base64": FAKE_SCREENSHOT,
         "timestamp": datetime.utcnow().isoformat()
     }
 
+async def _accept_stripe_event(payload: dict):
+    """The mock accepts these events without acting on them"""
+
+# Stripe event type -> handler
+STRIPE_EVENT_HANDLERS: Dict[str, Callable[[dict], Awaitable[None]]] = {
+    "customer.subscription.created": _accept_stripe_event,  # Activate customer
+    "invoice.payment_succeeded": _accept_stripe_event,  # Log revenue
+    "invoice.payment_failed": _accept_stripe_event,  # Mark past due
+    "customer.subscription.deleted": _accept_stripe_event,  # Deactivate customer
+}
+
 @app.post("/webhooks/stripe")
 async def stripe_webhook(payload: dict):
     """Stripe webhook - BUG: CRITICAL-1 - No signature validation!"""
@@ -321,16 +403,9 @@ async def stripe_webhook(payload: dict):
     # BUG: CRITICAL-1 - Signature is NOT validated!
     # Anyone can send fake webhook requests
     
-    event_type = payload.get("type")
-    
-    if event_type == "customer.subscription.created":
-        pass  # Activate customer
-    elif event_type == "invoice.payment_succeeded":
-        pass  # Log revenue
-    elif event_type == "invoice.payment_failed":
-        pass  # Mark past due
-    elif event_type == "customer.subscription.deleted":
-        pass  # Deactivate customer
+    handler = STRIPE_EVENT_HANDLERS.get(payload.get("type"))
+    if handler:
+        await handler(payload)
     
     return {"received": True}
 
@@ -354,14 +429,9 @@ async def vm_websocket(websocket, customer_id: str, vm_id: str):
     
     try:
         while True:
-            # Send fake screenshot every second
-            fake_screenshot = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9aw=="
-            await websocket.send_json({
-                "type": "screenshot",
-                "data": fake_screenshot,
-                "timestamp": datetime.utcnow().isoformat()
-            })
-            await asyncio.sleep(1)
+            # Send fake screenshot every VM_STREAM_INTERVAL seconds
+            await websocket.send_text(SCREENSHOT_FRAME_PREFIX + datetime.utcnow().isoformat() + '"}')
+            await asyncio.sleep(VM_STREAM_INTERVAL)
     except:
         pass  # Client disconnected
 
@@ -59,7 +59,13 @@ class StressTestRunner:
         self.bugs_found: List[Dict] = []
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        # The default 100-connection cap would queue the signup fan-out plus the
+        # rate-limit burst and count the queueing as server latency
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=200, ttl_dns_cache=300, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+        # Python 3.12+: gathered coroutines run inline until their first real await
+        if hasattr(asyncio, "eager_task_factory"):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -715,4 +721,10 @@ async def main():
         await runner.run_all_tests()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # cheaper task scheduling for hundreds of concurrent requests
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None  # asyncio's default loop
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
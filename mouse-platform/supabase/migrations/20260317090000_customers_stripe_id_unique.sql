@@ -0,0 +1,26 @@
+-- Unique Stripe customer ID: webhooks look up and update customers by it and
+-- expect at most one row per ID (NULLs stay allowed)
+
+-- Stop with a usable message instead of a bare index error when existing rows
+-- share an ID; those need merging by hand since each may hold billing history
+DO $$
+DECLARE
+  v_duplicates INTEGER;
+BEGIN
+  SELECT COUNT(*) INTO v_duplicates
+  FROM (
+    SELECT stripe_customer_id
+    FROM public.customers
+    WHERE stripe_customer_id IS NOT NULL
+    GROUP BY stripe_customer_id
+    HAVING COUNT(*) > 1
+  ) AS duplicated;
+
+  IF v_duplicates > 0 THEN
+    RAISE EXCEPTION '% Stripe customer IDs are shared by more than one customer; resolve them before adding idx_customers_stripe_customer_id', v_duplicates
+      USING HINT = 'SELECT stripe_customer_id, array_agg(id) FROM public.customers WHERE stripe_customer_id IS NOT NULL GROUP BY 1 HAVING COUNT(*) > 1;';
+  END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_stripe_customer_id
+  ON public.customers (stripe_customer_id);
@@ -0,0 +1,9 @@
+-- Indexes for the gateway's single-row lookups on high-cardinality keys
+-- (employees.vm_id, employees.idempotency_key and customers.stripe_customer_id are already indexed)
+CREATE INDEX IF NOT EXISTS idx_token_orders_checkout_session
+  ON public.token_orders (stripe_checkout_session_id)
+  WHERE stripe_checkout_session_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_king_mice_telegram_chat
+  ON public.king_mice (telegram_chat_id)
+  WHERE telegram_chat_id IS NOT NULL;
@@ -0,0 +1,34 @@
+-- Debit tokens and record the chat interaction in one transaction
+-- (one RPC round-trip instead of debit_tokens followed by a chat_logs insert).
+-- Every exchange is logged: the chat_logs row is written even when the debit
+-- fails for lack of balance, and success = false tells the caller it wasn't charged.
+CREATE OR REPLACE FUNCTION debit_tokens_and_log(
+    p_customer_id TEXT,
+    p_amount INTEGER,
+    p_description TEXT,
+    p_chat JSONB,
+    p_reference_id TEXT DEFAULT NULL,
+    p_reference_type TEXT DEFAULT NULL
+) RETURNS TABLE(success BOOLEAN, transaction_id UUID, new_balance INTEGER, chat_log_id UUID) AS $$
+DECLARE
+    v_success BOOLEAN;
+    v_transaction_id UUID;
+    v_new_balance INTEGER;
+    v_chat_log_id UUID;
+BEGIN
+    SELECT d.success, d.transaction_id, d.new_balance
+    INTO v_success, v_transaction_id, v_new_balance
+    FROM debit_tokens(p_customer_id, p_amount, p_description, p_reference_id, p_reference_type) d;
+
+    -- Logged whether or not the debit succeeded
+    INSERT INTO chat_logs (customer_id, message, response, action_taken)
+    VALUES (
+        p_customer_id,
+        p_chat->>'message',
+        p_chat->>'response',
+        p_chat->>'action_taken'
+    ) RETURNING id INTO v_chat_log_id;
+
+    RETURN QUERY SELECT v_success, v_transaction_id, v_new_balance, v_chat_log_id;
+END;
+$$ LANGUAGE plpgsql;
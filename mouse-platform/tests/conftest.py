@@ -2,7 +2,6 @@
 Test Configuration and Fixtures
 """
 import pytest
-import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timezone
 import os
@@ -23,13 +22,6 @@ os.environ['STRIPE_WEBHOOK_SECRET'] = 'whsec_test_webhook'
 os.environ['TELEGRAM_BOT_TOKEN'] = 'test-telegram-token'
 os.environ['MOONSHOT_API_KEY'] = 'test-moonshot-key'
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
 @pytest.fixture
 def mock_supabase():
     """Mock Supabase client"""
@@ -59,7 +51,7 @@ def mock_supabase():
     })
     mock.get_employees_by_customer = AsyncMock(return_value=[])
     mock.log_chat = AsyncMock(return_value={"id": "log_123"})
-    mock.health = MagicMock(return_value=True)
+    mock.health = AsyncMock(return_value=True)
     return mock
 
 @pytest.fixture
@@ -162,6 +154,18 @@ def test_headers():
         "Accept": "application/json"
     }
 
+@pytest.fixture(scope="session")
+def customer_token():
+    """Signed customer JWT, created once and shared across the run"""
+    from auth import security_manager
+    return security_manager.create_customer_token("cst_test123", "test@test.com")
+
+@pytest.fixture(scope="session")
+def admin_token():
+    """Signed admin JWT, created once and shared across the run"""
+    from auth import security_manager
+    return security_manager.create_admin_token("admin_test")
+
 @pytest.fixture
 def auth_headers():
     """Authenticated test headers"""
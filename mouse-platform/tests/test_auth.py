@@ -0,0 +1,158 @@
+"""
+Auth Utility Tests
+Tests for request sanitizers, JWT handling, admin API keys and CORS configuration
+"""
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+import auth
+from auth import JWT_ALGORITHM, JWT_SECRET, RequestValidator, get_cors_origins, security_manager
+
+@pytest.mark.parametrize("customer_id", ["cst_abc123", "cst_test-123", "cst_A_b"])
+def test_customer_id_sanitization(customer_id):
+    """Valid customer IDs pass through unchanged"""
+    assert RequestValidator.sanitize_customer_id(customer_id) == customer_id
+
+@pytest.mark.parametrize("bad", [
+    "",
+    "abc123",
+    "cst_" + "a" * 61,
+    "cst_1'; DROP TABLE customers; --",
+    "cst_1 or 1=1;",
+    "cst_drop",
+    "cst_/*x*/",
+    "<script>alert('xss')</script>",
+])
+def test_customer_id_rejects(bad):
+    """Empty, oversized, unprefixed and SQL injection IDs are rejected regardless of case"""
+    with pytest.raises(HTTPException) as exc:
+        RequestValidator.sanitize_customer_id(bad)
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("email, expected", [
+    ("Owner@CleanEats.com", "owner@cleaneats.com"),
+    ("a.b+tag@mail.example.co.uk", "a.b+tag@mail.example.co.uk"),
+])
+def test_email_sanitization(email, expected):
+    """Valid emails are accepted and lowercased"""
+    assert RequestValidator.sanitize_email(email) == expected
+
+@pytest.mark.parametrize("bad", [
+    "",
+    "not-an-email",
+    "a@b",
+    "a@@b.com",
+    "a@b..com",
+    "<script>@x.com",
+    "owner@cleaneats.com\n",  # must match to the true end of input
+    "a@" + "a." * 120 + "!",  # near-miss input is rejected without backtracking
+])
+def test_email_rejects(bad):
+    """Malformed emails are rejected"""
+    with pytest.raises(HTTPException) as exc:
+        RequestValidator.sanitize_email(bad)
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("name, expected", [
+    ("<b>Clean 'Eats'</b>", "bClean Eats/b"),
+    ('  "Joe\'s" Diner ', "Joes Diner"),
+    ("Clean Eats", "Clean Eats"),
+])
+def test_company_name_sanitization(name, expected):
+    """HTML and quote characters are stripped from company names"""
+    assert RequestValidator.sanitize_company_name(name) == expected
+
+@pytest.mark.parametrize("bad", ["", "A", "A" * 101])
+def test_company_name_rejects_bad_length(bad):
+    """Company names must be 2-100 characters"""
+    with pytest.raises(HTTPException) as exc:
+        RequestValidator.sanitize_company_name(bad)
+    assert exc.value.status_code == 400
+
+def test_customer_token_claims(customer_token):
+    """Customer tokens carry the customer ID, email, type and a revocation ID"""
+    payload = jwt.decode(customer_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    assert payload["sub"] == "cst_test123"
+    assert payload["email"] == "test@test.com"
+    assert payload["type"] == "customer"
+    assert len(payload["jti"]) == 32
+
+def test_admin_token_claims(admin_token):
+    """Admin tokens carry the admin type and no customer email"""
+    payload = jwt.decode(admin_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    assert payload["sub"] == "admin_test"
+    assert payload["type"] == "admin"
+    assert "email" not in payload
+
+def test_tokens_are_unique(customer_token, admin_token):
+    """Every issued token gets its own revocation ID"""
+    customer = jwt.decode(customer_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    admin = jwt.decode(admin_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    assert customer["jti"] != admin["jti"]
+
+def test_verify_token_reuses_cached_decode(monkeypatch, customer_token):
+    """Repeat verifications of the same token skip the signature check"""
+    monkeypatch.setattr(security_manager, "redis_client", None)
+    auth._decode_token_cached.cache_clear()
+    first = security_manager.verify_token(customer_token)
+    second = security_manager.verify_token(customer_token)
+    assert first == second and first is not second
+    assert auth._decode_token_cached.cache_info().hits >= 1
+
+def test_verify_token_rechecks_expiry_on_cache_hit(monkeypatch):
+    """A cached token still expires at its exp claim"""
+    monkeypatch.setattr(security_manager, "redis_client", None)
+    start = (int(time.time()) // 60 + 1) * 60 + 1
+    token = jwt.encode({"sub": "cst_test123", "type": "customer", "exp": start + 10}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=lambda: start))
+    assert security_manager.verify_token(token)["sub"] == "cst_test123"
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=lambda: start + 30))
+    with pytest.raises(HTTPException) as exc:
+        security_manager.verify_token(token)
+    assert exc.value.detail == "Token has expired"
+
+def test_verify_token_rejects_bad_signature(monkeypatch):
+    """Tokens signed with another secret are rejected"""
+    monkeypatch.setattr(security_manager, "redis_client", None)
+    token = jwt.encode({"sub": "cst_test123", "exp": time.time() + 60}, "not-the-secret", algorithm=JWT_ALGORITHM)
+    with pytest.raises(HTTPException) as exc:
+        security_manager.verify_token(token)
+    assert exc.value.detail == "Invalid token"
+
+def test_cors_origins_development(monkeypatch):
+    """Development allows localhost plus any configured origins"""
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    monkeypatch.setenv("ALLOWED_ORIGINS", "https://staging.mouse.is")
+    assert get_cors_origins() == ("http://localhost:3000", "http://localhost:5173", "https://staging.mouse.is")
+
+def test_cors_origins_production(monkeypatch):
+    """Production allows only the explicitly configured origins"""
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    monkeypatch.setenv("ALLOWED_ORIGINS", "https://app.mouse.is, https://mouse.is")
+    assert get_cors_origins() == ("https://app.mouse.is", "https://mouse.is")
+    monkeypatch.delenv("ALLOWED_ORIGINS")
+    assert get_cors_origins() == ()
+
+async def test_admin_api_key_accepted(monkeypatch):
+    """The configured admin key is accepted as a bearer token"""
+    monkeypatch.setattr(auth, "_ADMIN_API_KEY_BYTES", b"test_admin_key_12345")
+    assert await security_manager.verify_admin_api_key("Bearer test_admin_key_12345") is True
+
+async def test_admin_api_key_rejected(monkeypatch):
+    """Wrong, truncated, non-ASCII and missing keys are all rejected"""
+    monkeypatch.setattr(auth, "_ADMIN_API_KEY_BYTES", b"test_admin_key_12345")
+    for header, status in [
+        ("Bearer test_admin_key_12346", 403),
+        ("Bearer test_admin_key", 403),
+        ("Bearer tést_admin_key_1234", 403),
+        ("Bearer Bearer test_admin_key_12345", 403),
+        ("test_admin_key_12345", 401),
+        (None, 401),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            await security_manager.verify_admin_api_key(header)
+        assert exc.value.status_code == status
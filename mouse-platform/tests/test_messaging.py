@@ -187,3 +187,44 @@ def test_message_with_employee_context(client, mock_supabase):
         )
         
         assert response.status_code == 200
+
+async def test_handle_message_reads_customer_bundle(mock_supabase):
+    """handle_message loads customer, King Mouse and balance in one bundle read"""
+    from orchestrator import MousePlatform
+    
+    mock_supabase.get_customer_bundle = AsyncMock(return_value={
+        "customer": None,
+        "king_mouse": None,
+        "token_balance": None
+    })
+    platform = MousePlatform(supabase=mock_supabase)
+    
+    result = await platform.handle_message("cst_missing", "hello")
+    
+    assert result["message"] == "Customer not found"
+    mock_supabase.get_customer_bundle.assert_awaited_once_with("cst_missing")
+    mock_supabase.get_customer.assert_not_called()
+
+async def test_handle_message_logs_chat_without_tokens(mock_supabase):
+    """A customer with no tokens still gets the exchange logged, uncharged"""
+    from orchestrator import MousePlatform
+    
+    mock_supabase.get_customer_bundle = AsyncMock(return_value={
+        "customer": {"id": "cst_test123", "company_name": "Test Corp"},
+        "king_mouse": None,
+        "token_balance": {"balance": 0}
+    })
+    mock_supabase.debit_tokens_and_log = AsyncMock(return_value=[
+        {"success": False, "transaction_id": None, "new_balance": 0, "chat_log_id": "log_123"}
+    ])
+    platform = MousePlatform(supabase=mock_supabase)
+    
+    with patch('orchestrator.KingMouseAgent') as king, \
+         patch('orchestrator.background_queue') as queue:
+        queue.submit = AsyncMock()
+        king.return_value.process_message = AsyncMock(return_value={"message": "Hi there!"})
+        result = await platform.handle_message("cst_test123", "hello")
+    
+    assert result["token_balance"] == 0
+    mock_supabase.debit_tokens_and_log.assert_awaited_once()
+    assert mock_supabase.debit_tokens_and_log.call_args.kwargs["chat"]["message"] == "hello"
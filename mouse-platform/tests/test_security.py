@@ -85,6 +85,16 @@ def test_cors_restricted_in_production():
         origins = cors_middleware.options.get('allow_origins', [])
         assert "*" not in origins, "CORS should not allow * in production"
 
+def test_cors_preflight_is_cacheable(client):
+    """Preflight responses tell browsers how long to cache them"""
+    response = client.options("/health", headers={
+        "Origin": "https://app.automioapp.com",
+        "Access-Control-Request-Method": "GET"
+    })
+    assert response.status_code == 200
+    assert response.headers["access-control-max-age"] == "600"
+    assert "Origin" in response.headers["vary"]
+
 def test_customer_create_input_validation(client):
     """HIGH: Customer creation should validate inputs"""
     # Test empty company name
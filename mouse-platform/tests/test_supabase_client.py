@@ -0,0 +1,155 @@
+"""
+Supabase Client Tests
+Tests that queries run off the event loop and overlap up to the concurrency cap
+"""
+import asyncio
+import re
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from supabase_client import SupabaseClient
+
+QUERY_DELAY = 0.2  # seconds each stubbed query blocks its thread
+
+def _blocking_query(row):
+    """Query stub whose execute() blocks like supabase-py's sync HTTP call"""
+    def execute():
+        time.sleep(QUERY_DELAY)
+        return MagicMock(data=[row])
+    query = MagicMock()
+    query.execute = execute
+    return query
+
+@pytest.fixture
+def db():
+    """SupabaseClient whose tables return blocking query stubs"""
+    client = SupabaseClient()
+    client.client = MagicMock()
+    client.client.table.side_effect = lambda name: MagicMock(
+        **{"select.return_value.eq.return_value.limit.return_value": _blocking_query({"table": name})}
+    )
+    return client
+
+async def test_customer_bundle_reads_overlap(db):
+    """The three bundle reads run concurrently, not one after another"""
+    start = time.monotonic()
+    bundle = await db.get_customer_bundle("cst_test123")
+    elapsed = time.monotonic() - start
+
+    assert bundle["customer"] == {"table": "customers"}
+    assert bundle["king_mouse"] == {"table": "king_mice"}
+    assert bundle["token_balance"] == {"table": "token_balances"}
+    assert elapsed < QUERY_DELAY * 2
+
+async def test_queries_do_not_block_event_loop(db):
+    """Other coroutines keep running while a query is in flight"""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await db.get_customer("cst_test123")
+    task.cancel()
+
+    assert ticks > 5
+
+async def test_concurrency_cap_serializes_excess_queries(db):
+    """Queries beyond the cap wait for a free slot"""
+    db._semaphore = asyncio.Semaphore(1)
+    start = time.monotonic()
+    await asyncio.gather(db.get_customer("a"), db.get_customer("b"))
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= QUERY_DELAY * 2
+
+def test_app_and_platform_share_one_client():
+    """Routes and the orchestrator use the same client, cap and pool"""
+    import main
+    assert main.platform.supabase is main.supabase
+
+async def test_health_probe_times_out_and_caches_failure(monkeypatch):
+    """A stalled probe reports unhealthy quickly and isn't retried on every ping"""
+    monkeypatch.setattr("supabase_client.HEALTH_PROBE_TIMEOUT", QUERY_DELAY / 4)
+    client = SupabaseClient()
+    client.client = MagicMock()
+    client.client.table.return_value.select.return_value = _blocking_query({})
+
+    start = time.monotonic()
+    assert await client.health() is False
+    assert time.monotonic() - start < QUERY_DELAY
+    assert await client.health() is False
+    assert client.client.table.call_count == 1
+
+async def test_health_caches_success():
+    """A healthy probe is reused for the next pings"""
+    client = SupabaseClient()
+    client.client = MagicMock()
+
+    assert await client.health() is True
+    assert await client.health() is True
+    assert client.client.table.call_count == 1
+
+class _TransactionsTable:
+    """In-memory token_transactions serving PostgREST-style keyset pages"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+    
+    def query(self):
+        table = self
+        
+        class Query:
+            cursor = None
+            size = None
+            
+            def select(self, *args, **kwargs):
+                return self
+            eq = order = select
+            
+            def limit(self, size):
+                self.size = size
+                return self
+            
+            def or_(self, filters):
+                created_at, row_id = re.fullmatch(
+                    r'created_at\.lt\."(.+)",and\(created_at\.eq\."\1",id\.lt\.(.+)\)', filters
+                ).groups()
+                self.cursor = (created_at, row_id)
+                return self
+            
+            def execute(self):
+                table.queries.append(self.cursor)
+                rows = sorted(table.rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+                if self.cursor:
+                    rows = [r for r in rows if (r["created_at"], r["id"]) < self.cursor]
+                return MagicMock(data=rows[:self.size])
+        
+        return Query()
+
+async def test_iter_token_transactions_walks_pages_by_keyset():
+    """Every row is yielded once across pages, even with tied timestamps and mid-walk inserts"""
+    table = _TransactionsTable([
+        {"id": f"t{i}", "created_at": f"2026-03-17T09:00:0{i // 2}+00:00"} for i in range(7)
+    ])
+    client = SupabaseClient()
+    client.client = MagicMock()
+    client.client.table.side_effect = lambda name: table.query()
+    
+    seen = []
+    async for row in client.iter_token_transactions("cst_test123", batch_size=3):
+        seen.append(row["id"])
+        if len(seen) == 1:
+            # A new transaction lands while the walk is in progress
+            table.rows.append({"id": "t9", "created_at": "2026-03-17T09:00:09+00:00"})
+    
+    assert seen == ["t6", "t5", "t4", "t3", "t2", "t1", "t0"]
+    assert len(table.queries) == 3
+    assert table.queries[0] is None
+    assert table.queries[1] == ("2026-03-17T09:00:02+00:00", "t4")
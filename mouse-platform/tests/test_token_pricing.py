@@ -0,0 +1,96 @@
+"""
+Token Pricing Tests
+Tests for token packages, usage rates, the precomputed pricing tables and pricing routes
+"""
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+import token_pricing
+from token_pricing import TokenPricingConfig
+
+def test_comparison_table_is_built_once():
+    """Comparison table is precomputed and shared between calls"""
+    assert TokenPricingConfig.get_comparison_table() is TokenPricingConfig.get_comparison_table()
+
+def test_comparison_table_contents():
+    """Comparison table lists every package with formatted prices"""
+    table = {row["id"]: row for row in TokenPricingConfig.get_comparison_table()}
+    assert list(table) == ["starter", "growth", "pro", "enterprise"]
+    assert table["growth"]["price"] == "$49"
+    assert table["growth"]["tokens"] == "12,000"
+    assert table["growth"]["price_per_1000"] == "$4.08"
+    assert table["growth"]["popular"] is True
+    assert table["enterprise"]["price"] == "Custom"
+    assert table["enterprise"]["price_per_1000"] == "Custom"
+
+def test_action_costs_table_contents():
+    """Action costs table reflects the configured rates"""
+    costs = {row["action"]: row["cost"] for row in TokenPricingConfig.get_action_costs_table()}
+    assert costs["Message King Mouse"] == "10 tokens"
+    assert costs["VM Runtime"] == "500 tokens/hour"
+    assert costs["API Call"] == "1 token"
+
+def test_package_prices_are_precomputed():
+    """Derived price values are computed once and packages are immutable"""
+    pro = TokenPricingConfig.get_package("pro")
+    assert pro.display_price == "$99"
+    assert pro.price_per_token == 9900 / 30000
+    assert pro.display_price_per_1000 == "$3.30"
+    assert pro.display_tokens == "30,000"
+    with pytest.raises(FrozenInstanceError):
+        pro.price_cents = 0
+
+def test_custom_package_has_zero_unit_price():
+    """Enterprise package has no token amount, so unit prices are zero"""
+    enterprise = TokenPricingConfig.get_package("enterprise")
+    assert enterprise.price_per_token == 0
+    assert enterprise.price_per_1000_tokens == 0
+
+def test_all_packages_excludes_enterprise():
+    """Public package list skips the custom-priced enterprise tier"""
+    assert [p.slug for p in TokenPricingConfig.get_all_packages()] == ["starter", "growth", "pro"]
+    assert TokenPricingConfig.get_all_packages() is TokenPricingConfig.get_all_packages()
+
+def test_all_rates():
+    """Every configured rate is returned"""
+    assert len(TokenPricingConfig.get_all_rates()) == len(TokenPricingConfig.RATES)
+
+def test_pricing_dataclasses_use_slots():
+    """Packages and rates are slotted, with no per-instance __dict__"""
+    assert not hasattr(TokenPricingConfig.get_package("starter"), "__dict__")
+    assert not hasattr(TokenPricingConfig.get_rate("api_call"), "__dict__")
+
+def test_module_calculators_match_config():
+    """Function-form calculators agree with the TokenPricingConfig classmethods"""
+    assert token_pricing.calculate_message_cost(3) == TokenPricingConfig.calculate_message_cost(3) == 30
+    assert token_pricing.calculate_deploy_cost() == TokenPricingConfig.calculate_deploy_cost() == 100
+    assert token_pricing.calculate_vm_cost(1.5) == TokenPricingConfig.calculate_vm_cost(1.5) == 750
+    assert token_pricing.calculate_email_cost(2) == TokenPricingConfig.calculate_email_cost(2) == 10
+    assert token_pricing.calculate_api_cost(7) == TokenPricingConfig.calculate_api_cost(7) == 7
+    assert token_pricing.is_low_balance(499) and not token_pricing.is_low_balance(500)
+
+def test_token_packages_endpoint(client):
+    """Package listing is served from the pre-encoded body"""
+    response = client.get("/api/v1/token-packages")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    packages = response.json()["packages"]
+    assert [p["slug"] for p in packages] == ["starter", "growth", "pro"]
+    assert packages[1]["price"] == "$49"
+    assert packages[1]["price_per_1000"] == "$4.08"
+    assert packages[1]["popular"] is True
+
+def test_token_rates_endpoint(client):
+    """Rate listing is served from the pre-encoded body"""
+    response = client.get("/api/v1/token-rates")
+    assert response.status_code == 200
+    rates = {r["action_type"]: r["tokens"] for r in response.json()["rates"]}
+    assert rates == {r.action_type: r.tokens for r in TokenPricingConfig.get_all_rates()}
+
+def test_vm_cost_uses_integer_minutes():
+    """VM runtime is billed per whole minute with exact integer math"""
+    assert token_pricing.calculate_vm_cost_minutes(60) == TokenPricingConfig.calculate_vm_cost_minutes(60) == 500
+    assert token_pricing.calculate_vm_cost_minutes(90) == 750
+    assert token_pricing.calculate_vm_cost_minutes(1) == 8
+    assert token_pricing.calculate_vm_cost(0.29) == TokenPricingConfig.calculate_vm_cost(0.29) == 141
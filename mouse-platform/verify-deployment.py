@@ -22,17 +22,24 @@ colors = {
     "reset": "\033[0m"
 }
 
+# Status line prefixes, built once instead of on every log call
+SUCCESS_PREFIX = colors["green"] + "✅ "
+ERROR_PREFIX = colors["red"] + "❌ "
+INFO_PREFIX = colors["blue"] + "ℹ️  "
+WARNING_PREFIX = colors["yellow"] + "⚠️  "
+RESET = colors["reset"]
+
 def log_success(msg):
-    print(f"{colors['green']}✅ {msg}{colors['reset']}")
+    print(f"{SUCCESS_PREFIX}{msg}{RESET}")
 
 def log_error(msg):
-    print(f"{colors['red']}❌ {msg}{colors['reset']}")
+    print(f"{ERROR_PREFIX}{msg}{RESET}")
 
 def log_info(msg):
-    print(f"{colors['blue']}ℹ️  {msg}{colors['reset']}")
+    print(f"{INFO_PREFIX}{msg}{RESET}")
 
 def log_warning(msg):
-    print(f"{colors['yellow']}⚠️  {msg}{colors['reset']}")
+    print(f"{WARNING_PREFIX}{msg}{RESET}")
 
 async def test_health_endpoint(session):
     """Test the health check endpoint"""